@@ -0,0 +1,56 @@
+"""
+Compares the full en_core_web_sm pipeline against the NER-only pipeline and
+its prebuilt artifact: model load time and NER time over a batch of documents.
+
+    python benchmarks/bench_nlp_loader.py [--docs 500]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import spacy
+
+import nlp_loader
+
+SAMPLE = (
+    "John Smith from Acme Corporation met Maria Garcia in Berlin on 12 March 2023 "
+    "to discuss the $250,000 contract. Reach him at john.smith@acme.com or +1 555 123 4567. "
+)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def run(name, loader, texts):
+    nlp, load_time = timed(loader)
+    _, ner_time = timed(lambda: [[ent.label_ for ent in nlp(text).ents] for text in texts])
+    print(f"{name:<12} load {load_time:7.3f}s   ner {ner_time:7.3f}s   components {nlp.pipe_names}")
+    return load_time, ner_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=nlp_loader.DEFAULT_MODEL)
+    parser.add_argument("--docs", type=int, default=500)
+    args = parser.parse_args()
+
+    texts = [SAMPLE * 4] * args.docs
+    if not os.path.isdir(nlp_loader.artifact_path(args.model)):
+        nlp_loader.build_artifact(args.model)
+
+    full = run("full", lambda: nlp_loader.load_full(args.model), texts)
+    trimmed = run("trimmed", lambda: nlp_loader.load_trimmed(args.model), texts)
+    artifact = run("artifact", lambda: spacy.load(nlp_loader.artifact_path(args.model)), texts)
+
+    for name, (load_time, ner_time) in (("trimmed", trimmed), ("artifact", artifact)):
+        print(f"{name}: load {full[0] / load_time:.1f}x faster, ner {full[1] / ner_time:.1f}x faster than full")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Checks that PDFRedactor.process_pdf runs in bounded memory: synthetic PDFs of
+increasing length are redacted in fresh processes and their peak RSS compared.
+tests/test_pdf_memory.py compares the growth above the loaded model between
+the 500- and 5,000-page runs.
+
+    python benchmarks/bench_pdf_memory.py [--pages 500 5000] [--workers 1]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import fitz  # PyMuPDF
+
+LINE = "Invoice {i} for John Smith, john.smith{i}@example.com, +1 555 010 {n:04d}, paid from 10.0.{a}.{b}."
+
+
+def make_pdf(path, pages):
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        for row in range(20):
+            n = (i * 20 + row) % 10000
+            text = LINE.format(i=i, n=n, a=n // 256 % 256, b=n % 256)
+            page.insert_text((40, 60 + row * 30), text, fontsize=9)
+    doc.save(path)
+
+
+def measure(path, workers):
+    """
+    Redacts path in a child process and returns (baseline, peak) RSS in MB:
+    the peak once the model is loaded, and the peak after the redaction.
+    """
+    code = (
+        "import resource, sys; sys.path.insert(0, sys.argv[1]);"
+        "from pdf_redacter import PDFRedactor;"
+        "redactor = PDFRedactor();"
+        "baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss;"
+        "redactor.process_pdf(sys.argv[2], 100, 'x', workers=int(sys.argv[3]));"
+        "print(baseline, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+    )
+    out = subprocess.run([sys.executable, "-c", code, ROOT, path, str(workers)], check=True, capture_output=True, text=True)
+    baseline, peak = out.stdout.split()[-2:]
+    return int(baseline) / 1024, int(peak) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[500, 5000])
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in args.pages:
+            path = os.path.join(tmp, f"synthetic_{pages}.pdf")
+            make_pdf(path, pages)
+            baseline, peak = measure(path, args.workers)
+            print(f"{pages:>6} pages: peak RSS {peak:8.1f} MB, {peak - baseline:8.1f} MB above the loaded model")
+
+
+if __name__ == "__main__":
+    main()
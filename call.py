@@ -1,8 +1,12 @@
+import os
 import sys
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QWidget, QLabel,
-                             QPushButton, QFileDialog, QHBoxLayout, QFrame, QComboBox, QDialog, QLineEdit)
+                             QPushButton, QFileDialog, QHBoxLayout, QFrame, QComboBox, QDialog, QLineEdit, QSlider,
+                             QProgressBar)
 from PyQt5.QtCore import Qt
-import subprocess
+
+from gui_jobs import Job, JobQueue
+from redact_worker import RedactWorkerClient
 
 
 class LoginPage(QDialog):
@@ -136,6 +140,20 @@ class RedactApp(QMainWindow):
         """)
         sidebar_layout.addWidget(login_button)
 
+        # Progress of the running job, kept in the sidebar so it survives content changes
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        sidebar_layout.addWidget(self.progress_bar)
+
+        self.status_label = QLabel("")
+        self.status_label.setWordWrap(True)
+        self.status_label.setStyleSheet("font-size: 14px; color: white;")
+        sidebar_layout.addWidget(self.status_label)
+
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setStyleSheet("font-size: 16px; padding: 10px; color: white;")
+        sidebar_layout.addWidget(self.cancel_button)
+
         sidebar.setLayout(sidebar_layout)
         main_layout.addWidget(sidebar, 1)
 
@@ -163,6 +181,25 @@ class RedactApp(QMainWindow):
         self.file_type_combo.setStyleSheet("font-size: 16px;")
         self.content_layout.addWidget(self.file_type_combo)
 
+        # Redaction level and style, forwarded to the redaction worker
+        level_label = QLabel("Redaction Level")
+        level_label.setStyleSheet("font-size: 18px; margin-top: 20px;")
+        self.content_layout.addWidget(level_label)
+
+        self.level_slider = QSlider(Qt.Horizontal)
+        self.level_slider.setMinimum(0)
+        self.level_slider.setMaximum(100)
+        self.level_slider.setSingleStep(25)
+        self.level_slider.setPageStep(25)
+        self.level_slider.setTickInterval(25)
+        self.level_slider.setValue(100)
+        self.content_layout.addWidget(self.level_slider)
+
+        self.style_combo = QComboBox()
+        self.style_combo.addItems(["blackout", "blur", "synthetic"])
+        self.style_combo.setStyleSheet("font-size: 16px;")
+        self.content_layout.addWidget(self.style_combo)
+
         # Redaction button
         redaction_button = QPushButton("Redact")
         redaction_button.setStyleSheet("""
@@ -176,12 +213,26 @@ class RedactApp(QMainWindow):
         """)
         self.content_layout.addWidget(redaction_button)
 
+        # Outcome of the last batch, shown under the controls so more jobs can follow
+        self.result_label = QLabel("")
+        self.result_label.setAlignment(Qt.AlignCenter)
+        self.result_label.setWordWrap(True)
+        self.result_label.setStyleSheet("font-size: 16px; color: #32CD32; margin-top: 20px;")
+        self.content_layout.addWidget(self.result_label)
+
         self.content.setLayout(self.content_layout)
         main_layout.addWidget(self.content, 4)  # Give more space to the main content area
 
         main_widget.setLayout(main_layout)
         self.setCentralWidget(main_widget)
 
+        # Redaction jobs run in a single long-lived worker that keeps the models loaded
+        self.worker = RedactWorkerClient()
+        # and are sent to it one at a time from a background thread
+        self.jobs = JobQueue(self, progress_bar=self.progress_bar, status_label=self.status_label,
+                             cancel_button=self.cancel_button)
+        self.jobs.drained.connect(self.redaction_finished)
+
         # Connect signals
         login_button.clicked.connect(self.show_login_page)  # Connect to the login page
         redaction_button.clicked.connect(self.redact)
@@ -208,33 +259,43 @@ class RedactApp(QMainWindow):
             self.log_redaction()
 
     def pdf_redaction(self):
-        # Change the content of the current window to show processing
-        
-        try:
-            result = subprocess.run(["python", "pdfAlgo.py"], check=True, capture_output=True, text=True)
-        except subprocess.CalledProcessError:
-            self.change_content_to_result("Error during PDF Redaction.")
+        self.run_redaction_job("pdf", "PDF Files (*.pdf)")
+
     def doc_redaction(self):
-        # Change the content of the current window to show processing
-        
-        try:
-            result = subprocess.run(["python", "docalgo.py"], check=True, capture_output=True, text=True)
-        except subprocess.CalledProcessError:
-            self.change_content_to_result("Error during PDF Redaction.")
+        self.run_redaction_job("doc", "PowerPoint Files (*.pptx)")
+
     def ppt_redaction(self):
-        # Change the content of the current window to show processing
-        
-        try:
-            result = subprocess.run(["python", "pptalgo.py"], check=True, capture_output=True, text=True)
-        except subprocess.CalledProcessError:
-            self.change_content_to_result("Error during PDF Redaction.")
+        self.run_redaction_job("ppt", "PowerPoint Files (*.pptx)")
+
     def log_redaction(self):
-        # Change the content of the current window to show processing
-        
-        try:
-            result = subprocess.run(["python", "logalgo.py"], check=True, capture_output=True, text=True)
-        except subprocess.CalledProcessError:
-            self.change_content_to_result("Error during PDF Redaction.")
+        self.run_redaction_job("csv", "CSV Files (*.csv)")
+
+    def run_redaction_job(self, job_type, file_filter):
+        file_name, _ = QFileDialog.getOpenFileName(self, "Choose File", "", file_filter)
+        if not file_name:
+            return
+
+        job = {
+            "type": job_type,
+            "input": file_name,
+            "level": self.level_slider.value() // 25 * 25,
+            "style": self.style_combo.currentText(),
+        }
+        self.jobs.submit(Job(os.path.basename(file_name), self.worker.submit, job))
+
+    def redaction_finished(self):
+        messages = [
+            f"Redacted file saved at: {output_path}" if output_path else f"{name}: no sensitive data found."
+            for name, output_path in self.jobs.finished
+        ]
+        messages += [f"Error during redaction of {name}: {error}" for name, error in self.jobs.failed]
+        messages += [f"Redaction of {name} was cancelled." for name in self.jobs.cancelled]
+        self.result_label.setText("\n".join(messages))
+
+    def closeEvent(self, event):
+        self.jobs.shutdown()
+        self.worker.close()
+        super().closeEvent(event)
 
     # Other redaction methods go here...
 
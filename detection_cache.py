@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+from sqlite_store import open_store
+
+# Set to a file path to keep detections across runs and share them between processes
+STORE_PATH = os.environ.get("REDACT_DETECTION_DB")
+
+# Part of every key, so rows written in an older layout are never read back
+FORMAT_VERSION = 2
+
+# Every cache of this process, so their hit rates can be reported together
+_caches = weakref.WeakSet()
+
+
+class DetectionCache:
+    """
+    Remembers the entities detected in a text fragment, keyed by a hash of the
+    fragment, the model and the detection policy, so boilerplate that repeats
+    across pages, slides and documents goes through NER only once. Recent
+    results are kept in memory up to max_spans spans in total, each fragment
+    counting one more, so unique pages cannot make memory grow with the
+    length of a document. With a store path, results are also saved to a
+    SQLite file shared across runs and processes.
+
+    Entities are (start, end, text, label) tuples. Only (start, end, label) is
+    kept, in memory and on disk, so no detected value is ever written out; the
+    text is cut from the fragment again when a cached result is returned.
+    """
+
+    def __init__(self, model_id, max_spans=20_000, path=STORE_PATH):
+        self.model_id = model_id
+        self.max_spans = max_spans
+        self.entries = OrderedDict()
+        self.held = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.store = None
+        if path:
+            self.store = open_store(path)
+            self.store.execute("CREATE TABLE IF NOT EXISTS detections (key TEXT PRIMARY KEY, entities TEXT)")
+        _caches.add(self)
+
+    def key(self, text, policy):
+        return hashlib.sha256(f"{FORMAT_VERSION}\0{self.model_id}\0{policy}\0{text}".encode("utf-8", "surrogatepass")).hexdigest()
+
+    def get(self, key):
+        """Returns the cached (start, end, label) spans for a key, or None."""
+        with self.lock:
+            spans = self.entries.get(key)
+            if spans is not None:
+                self.entries.move_to_end(key)
+            elif self.store is not None:
+                rows = self.store.execute("SELECT entities FROM detections WHERE key = ?", (key,))
+                if rows:
+                    spans = [tuple(span) for span in json.loads(rows[0][0])]
+                    self._remember(key, spans)
+            if spans is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return spans
+
+    def put(self, key, spans):
+        with self.lock:
+            self._remember(key, spans)
+            if self.store is not None:
+                self.store.execute("INSERT OR REPLACE INTO detections VALUES (?, ?)", (key, json.dumps(spans)))
+
+    def _remember(self, key, spans):
+        previous = self.entries.pop(key, None)
+        if previous is not None:
+            self.held -= 1 + len(previous)
+        self.entries[key] = spans
+        self.held += 1 + len(spans)
+        while self.held > self.max_spans and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            self.held -= 1 + len(evicted)
+
+    def detect_many(self, texts, policy, detect):
+        """
+        Returns the entities of every text, calling detect(texts) only for the
+        distinct texts that are not cached yet.
+        """
+        keys = [self.key(text, policy) for text in texts]
+        found = {}
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key in found or key in missing:
+                # A repeat within the same batch also skips detection
+                with self.lock:
+                    self.hits += 1
+                continue
+            spans = self.get(key)
+            if spans is None:
+                missing[key] = text
+            else:
+                found[key] = spans
+
+        if missing:
+            for key, entities in zip(missing, detect(list(missing.values()))):
+                spans = [(start, end, label) for start, end, _, label in entities]
+                self.put(key, spans)
+                found[key] = spans
+        return [[(start, end, text[start:end], label) for start, end, label in found[key]] for key, text in zip(keys, texts)]
+
+    def stats(self):
+        return summarize(self.hits, self.misses, len(self.entries))
+
+
+def summarize(hits, misses, size):
+    lookups = hits + misses
+    return {"hits": hits, "misses": misses, "hit_rate": hits / lookups if lookups else 0.0, "size": size}
+
+
+def combined_stats():
+    """Adds up the stats of every detection cache of this process."""
+    caches = list(_caches)
+    return summarize(
+        sum(cache.hits for cache in caches),
+        sum(cache.misses for cache in caches),
+        sum(len(cache.entries) for cache in caches),
+    )
+
+
+def describe(stats):
+    return f"detection cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate)"
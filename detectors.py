@@ -0,0 +1,95 @@
+import re
+from functools import lru_cache
+
+# Regex detectors shared by every redactor, one pattern per label. Patterns only
+# use non-capturing groups so that a match can be attributed to its label.
+PATTERNS = {
+    "EMAIL": r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b",
+    "RELAY": r"relay=.*?@.*? ",
+    "IPV6": r"\b(?:[A-Fa-f0-9]{1,4}:){7}[A-Fa-f0-9]{1,4}\b",
+    "IP": r"\b(?:\d{1,3}\.){3}\d{1,3}\b",
+    "ADDRESS": r"(?i:address)[ \t]*[:\-][ \t]*[A-Za-z0-9 \t,]+",
+    "NAME": r"(?i:name)[ \t]*[:\-][ \t]*\w+[ \t]\w+[ \t]\w+",
+    "MONEY": r"\$\d+(?:\.\d{2})?",
+    "DATE": r"\b(?:\d{2}[-/]\d{2}[-/]\d{4}|\d{4}[-/]\d{2}[-/]\d{2}|\d{2}[ /]\d{2}[ /]\d{4}|\d{2} [A-Za-z]+ \d{4})\b",
+    "TIME": r"\b\d{1,2}:\d{2}(?::\d{2})?(?:\s?[APap][Mm])?\b",
+    "PHONE": r"(?<![\w+])(?:\+?\d{1,3}[-. ]?)?\(?\d{3}\)?[-. ]?\d{3}[-. ]?\d{4}\b",
+}
+
+# Mail/syslog flavoured patterns used by the log redactor
+LOG_PATTERNS = {
+    "RELAY": r"relay=.*?@.*? ",
+    "IP": r"\b(?:\d{1,3}\.){3}\d{1,3}\b",
+    "DATE": r"\b\d{4}-\d{2}-\d{2}\b|\b\d{1,2}[A-Za-z]+\d{2}\b",
+    "TIME": r"\b\d{2}:\d{2}:\d{2}\b",
+}
+
+# Bump whenever a pattern changes, so cached detections from older patterns are not reused
+POLICY_VERSION = 3
+
+PATTERN_SETS = {
+    "default": PATTERNS,
+    "log": LOG_PATTERNS,
+}
+
+
+class Detector:
+    """
+    Scans text for a fixed set of labels with one combined regex, so every text
+    is read a single time no matter how many labels are enabled. When two labels
+    match at the same position the one listed first in the pattern set wins.
+    """
+
+    def __init__(self, labels, patterns=PATTERNS):
+        self.labels = [label for label in patterns if label in labels]
+        if self.labels:
+            self.regex = re.compile("|".join(f"(?P<{label}>{patterns[label]})" for label in self.labels))
+        else:
+            self.regex = None
+        # A lookahead finds a label's match at every position, including ones
+        # that start inside an earlier match of the same label
+        self.label_regexes = [(label, re.compile(f"(?=({patterns[label]}))")) for label in self.labels]
+
+    def finditer(self, text):
+        if self.regex is None:
+            return iter(())
+        return self.regex.finditer(text)
+
+    def scan(self, text):
+        """Returns (start, end, label) for every match in text, left to right."""
+        return [(match.start(), match.end(), match.lastgroup) for match in self.finditer(text)]
+
+    def scan_each(self, text):
+        """
+        Like scan(), but runs every label's pattern on its own, so a value is
+        still reported under its label where it overlaps a match of another
+        label. Narrowing the result to fewer labels then does not drop values
+        that were hidden behind a match of an excluded label. Matches of one
+        label may overlap too (TIME finds both "15:12:30" and "12:30:45" in
+        "15:12:30:45"); a match that ends inside an earlier one of its label
+        adds nothing and is left out. Callers merge overlaps when splicing.
+        """
+        spans = []
+        for label, regex in self.label_regexes:
+            covered = 0
+            for match in regex.finditer(text):
+                start, end = match.span(1)
+                if end > covered:
+                    spans.append((start, end, label))
+                    covered = end
+        return sorted(spans)
+
+
+@lru_cache(maxsize=None)
+def _build_detector(labels, flavor):
+    return Detector(labels, PATTERN_SETS[flavor])
+
+
+def get_detector(labels, flavor="default"):
+    """Returns the compiled detector for a policy, building it only once."""
+    return _build_detector(frozenset(labels), flavor)
+
+
+def policy_id(labels, flavor="default"):
+    """Identifies what a detection run looks for, for keying cached results."""
+    return f"{flavor}-v{POLICY_VERSION}:{','.join(sorted(labels))}"
@@ -1,20 +1,28 @@
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QWidget, QLabel, QPushButton, QFileDialog, QSlider, QRadioButton, 
-    QButtonGroup, QMessageBox, QHBoxLayout, QFrame, QProgressBar
+    QButtonGroup, QMessageBox, QHBoxLayout, QFrame, QProgressBar, QLineEdit
 )
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QIcon, QColor
 
 import sys
 import os
-import spacy
-import re
-from faker import Faker
+from nlp_loader import load_nlp, model_id
 from pptx import Presentation
 
-# Initialize SpaCy and Faker
-nlp = spacy.load("en_core_web_sm")
-fake = Faker()
+from detection_cache import DetectionCache, describe
+from detectors import get_detector, policy_id
+from job_control import check_cancelled, report
+from manifest import Manifest
+from pseudonyms import PseudonymCache
+from replacer import resolve_overlaps, splice, splice_styled
+import synthetic
+from variants import parse_variants, variant_path
+from gui_jobs import Job, JobQueue
+
+# Initialize SpaCy
+nlp = load_nlp()
+detection_cache = DetectionCache(model_id(nlp))
 
 # Define redaction levels
 REDACTION_LEVELS = {
@@ -25,6 +33,13 @@ REDACTION_LEVELS = {
     100: ["ORG", "EMAIL", "PHONE", "MONEY", "IP", "DATE", "TIME", "ADDRESS", "PERSON"]
 }
 
+# Detection always looks for everything, so any level can be rendered from one result
+ALL_LABELS = REDACTION_LEVELS[100]
+
+def labels_for_level(level):
+    """Returns the labels redacted at a level, taken from the highest defined level not above it."""
+    return REDACTION_LEVELS[max(threshold for threshold in REDACTION_LEVELS if threshold <= level)]
+
 # Function to extract text from PowerPoint
 def extract_text_from_ppt(ppt_path):
     prs = Presentation(ppt_path)
@@ -37,74 +52,133 @@ def extract_text_from_ppt(ppt_path):
 
 # Function to identify sensitive entities
 def detect_entities(text, redaction_labels):
-    doc = nlp(text)
-    entities = []
-    for ent in doc.ents:
-        if ent.label_ in redaction_labels:
-            entities.append((ent.text, ent.label_))
-    # Additional regex-based detection for MONEY, TIME, and sensitive data
-    if "MONEY" in redaction_labels:
-        money_matches = re.findall(r"\$\d+(\.\d{2})?", text)
-        entities.extend([(match, "MONEY") for match in money_matches])
-    if "TIME" in redaction_labels:
-        time_matches = re.findall(r"\b\d{1,2}:\d{2}(?:\s?[APap][Mm])?\b", text)
-        entities.extend([(match, "TIME") for match in time_matches])
-    if "IP" in redaction_labels:
-        ip_matches = re.findall(r"\b(?:\d{1,3}\.){3}\d{1,3}\b", text)
-        entities.extend([(match, "IP") for match in ip_matches])
-    return entities
+    return detect_entities_batch([text], redaction_labels)[0]
+
+# Function to identify sensitive entities in many texts with batched NER
+def detect_entities_batch(texts, redaction_labels, batch_size=64, n_process=1, cancelled=None):
+    detector = get_detector(redaction_labels)
+
+    def detect(texts):
+        results = []
+        for text, doc in zip(texts, nlp.pipe(texts, batch_size=batch_size, n_process=n_process)):
+            check_cancelled(cancelled)
+            entities = []
+            for ent in doc.ents:
+                if ent.label_ in redaction_labels:
+                    entities.append((ent.start_char, ent.end_char, ent.text, ent.label_))
+            # Regex-based detection for MONEY, TIME, IP and other pattern-shaped data
+            for start, end, label in detector.scan_each(text):
+                entities.append((start, end, text[start:end], label))
+            results.append(entities)
+        return results
+
+    # Repeated text (template slides, footers) is only run through NER once
+    return detection_cache.detect_many(texts, policy_id(redaction_labels), detect)
 
 # Function to generate synthetic replacements for entities
 def generate_synthetic_data(label):
-    if label == "PERSON":
-        return fake.name()
-    elif label == "ORG":
-        return fake.company()
-    elif label == "EMAIL":
-        return fake.email()
-    elif label == "PHONE":
-        return fake.phone_number()
-    elif label == "MONEY":
-        return fake.pricetag()
-    elif label == "IP":
-        return fake.ipv4()
-    elif label == "DATE":
-        return fake.date()
-    elif label == "TIME":
-        return fake.time()
-    elif label == "ADDRESS":
-        return fake.address()
-    else:
-        return "[SYNTHETIC DATA]"
+    return synthetic.draw(label, "[SYNTHETIC DATA]")
+
+# Every occurrence of an entity gets the same synthetic value
+pseudonyms = PseudonymCache(generate_synthetic_data)
 
 # Function to apply redaction or synthetic data
 def apply_redaction(text, entities, style="blackout"):
-    for entity, label in entities:
-        if style == "blackout":
-            redacted = "█" * len(entity)
-        elif style == "blur":
-            redacted = "*" * len(entity)
-        elif style == "synthetic":
-            redacted = generate_synthetic_data(label)
-        else:
-            redacted = "[REDACTED]"
-        text = re.sub(re.escape(entity), redacted, text)
-    return text
+    spans = [(start, end, label) for start, end, _, label in entities]
+    return splice(text, spans, style, synthesize=pseudonyms.get)
+
+def text_shapes(prs):
+    """Returns (slide index, shape index, shape) for every shape with a text frame."""
+    return [
+        (slide_index, shape_index, shape)
+        for slide_index, slide in enumerate(prs.slides)
+        for shape_index, shape in enumerate(slide.shapes)
+        if shape.has_text_frame
+    ]
+
+# Function to detect every sensitive entity in a deck, for all labels at once
+def detect_presentation(prs, batch_size=64, n_process=1, progress=None, cancelled=None):
+    # Collect every text frame first so NER runs over the whole deck in batches
+    shapes = text_shapes(prs)
+    texts = [shape.text for _, _, shape in shapes]
+    if progress is None:
+        return detect_entities_batch(texts, ALL_LABELS, batch_size=batch_size, n_process=n_process, cancelled=cancelled)
+
+    # To report progress(slides_done, slide_count) the deck is detected a few
+    # batches at a time, in slide order
+    slide_count = len(prs.slides)
+    chunk_size = batch_size * 4
+    detections = []
+    for start in range(0, len(texts), chunk_size):
+        end = min(start + chunk_size, len(texts))
+        detections += detect_entities_batch(
+            texts[start:end], ALL_LABELS, batch_size=batch_size, n_process=n_process, cancelled=cancelled
+        )
+        report(progress, shapes[end][0] if end < len(shapes) else slide_count, slide_count)
+    if not texts:
+        report(progress, slide_count, slide_count)
+    return detections
+
+# Function to redact a deck at a level and style from an earlier detection result
+def render_presentation(prs, detections, level, style="blackout", manifest=None, cancelled=None):
+    redaction_labels = set(labels_for_level(level))
+    for (slide_index, shape_index, shape), entities in zip(text_shapes(prs), detections):
+        check_cancelled(cancelled)
+        selected = [entity for entity in entities if entity[3] in redaction_labels]
+        if manifest is not None:
+            for start, end, label in resolve_overlaps((start, end, label) for start, end, _, label in selected):
+                manifest.add(slide_index, shape_index, start, end, label, style)
+        shape.text = apply_redaction(shape.text, selected, style)
+
+def detect_ppt(ppt_path, batch_size=64, n_process=1, progress=None, cancelled=None):
+    return detect_presentation(Presentation(ppt_path), batch_size, n_process, progress, cancelled)
+
+def render_ppt(ppt_path, output_path, detections, level, style="blackout", manifest_path=None, cancelled=None):
+    prs = Presentation(ppt_path)
+    manifest = Manifest("pptx", ppt_path) if manifest_path else None
+    render_presentation(prs, detections, level, style, manifest, cancelled)
+    prs.save(output_path)
+    if manifest is not None:
+        manifest.save(manifest_path)
 
 # Function to redact text in PowerPoint
-def redact_ppt(ppt_path, output_path, level, style="blackout"):
+# progress(slides_done, slide_count) is called as the deck is detected, and
+# the job stops with Cancelled once cancelled() returns true
+def redact_ppt(ppt_path, output_path, level, style="blackout", batch_size=64, n_process=1, manifest_path=None,
+               progress=None, cancelled=None):
     prs = Presentation(ppt_path)
-    redaction_labels = REDACTION_LEVELS.get(level, [])
-    
-    for slide in prs.slides:
-        for shape in slide.shapes:
-            if shape.has_text_frame:
-                original_text = shape.text
-                entities = detect_entities(original_text, redaction_labels)
-                redacted_text = apply_redaction(original_text, entities, style)
-                shape.text = redacted_text
-    
+    manifest = Manifest("pptx", ppt_path) if manifest_path else None
+    detections = detect_presentation(prs, batch_size, n_process, progress, cancelled)
+    render_presentation(prs, detections, level, style, manifest, cancelled)
     prs.save(output_path)
+    if manifest is not None:
+        manifest.save(manifest_path)
+
+# Function to redact a deck from a saved manifest, without extraction or NER
+def apply_ppt_manifest(ppt_path, manifest_path, output_path):
+    manifest = Manifest.load(manifest_path, "pptx")
+    manifest.check_source(ppt_path)
+    spans_by_shape = {}
+    for slide_index, shape_index, start, end, label, style in manifest.entries:
+        spans_by_shape.setdefault((slide_index, shape_index), []).append((start, end, label, style))
+
+    prs = Presentation(ppt_path)
+    for slide_index, shape_index, shape in text_shapes(prs):
+        spans = spans_by_shape.get((slide_index, shape_index))
+        if spans:
+            shape.text = splice_styled(shape.text, spans, synthesize=pseudonyms.get)
+    prs.save(output_path)
+
+# Function to write several level/style variants of a deck from a single detection pass
+def redact_ppt_variants(ppt_path, variants, batch_size=64, n_process=1, detections=None, cancelled=None):
+    if detections is None:
+        detections = detect_ppt(ppt_path, batch_size, n_process, cancelled=cancelled)
+    output_paths = []
+    for style, level in variants:
+        output_path = variant_path(ppt_path, style, level)
+        render_ppt(ppt_path, output_path, detections, level, style, cancelled=cancelled)
+        output_paths.append(output_path)
+    return output_paths
 
 class RedactApp(QMainWindow):
     def __init__(self):
@@ -112,8 +186,9 @@ class RedactApp(QMainWindow):
 
         self.setWindowTitle("RE-DACT - PowerPoint Redactor")
         self.setGeometry(100, 100, 800, 600)
-        self.ppt_path = None
+        self.ppt_paths = []
         self.redacted_ppt_path = None
+        self.detections = {}
 
         # Applying a custom color scheme
         self.setStyleSheet("""
@@ -222,6 +297,17 @@ class RedactApp(QMainWindow):
         style_frame.setLayout(style_layout)
         layout.addWidget(style_frame)
 
+        # Batch Variants Frame
+        variants_frame = QFrame()
+        variants_layout = QVBoxLayout()
+        self.variants_label = QLabel("Extra Variants")
+        variants_layout.addWidget(self.variants_label)
+        self.variants_input = QLineEdit()
+        self.variants_input.setPlaceholderText("e.g. blackout-50, synthetic-100")
+        variants_layout.addWidget(self.variants_input)
+        variants_frame.setLayout(variants_layout)
+        layout.addWidget(variants_frame)
+
         # Redact Button
         self.redact_button = QPushButton("Redact")
         self.redact_button.clicked.connect(self.redact_ppt)
@@ -233,6 +319,17 @@ class RedactApp(QMainWindow):
         self.progress_bar.setVisible(False)
         layout.addWidget(self.progress_bar)
 
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+
+        self.cancel_button = QPushButton("Cancel")
+        layout.addWidget(self.cancel_button)
+
+        # Decks are redacted one after another on a background thread
+        self.jobs = JobQueue(self, progress_bar=self.progress_bar, status_label=self.status_label,
+                             cancel_button=self.cancel_button)
+        self.jobs.drained.connect(self.redaction_finished)
+
         # Download Button
         self.download_button = QPushButton("Download Redacted File")
         self.download_button.setIcon(QIcon("download-icon.png"))
@@ -245,36 +342,65 @@ class RedactApp(QMainWindow):
 
     def choose_file(self):
         options = QFileDialog.Options()
-        file_name, _ = QFileDialog.getOpenFileName(self, "Open PowerPoint File", "", "PowerPoint Files (*.pptx)", options=options)
-        if file_name:
-            self.ppt_path = file_name
-            self.file_label.setText(f"Selected: {os.path.basename(file_name)}")
+        file_names, _ = QFileDialog.getOpenFileNames(self, "Open PowerPoint Files", "", "PowerPoint Files (*.pptx)", options=options)
+        if file_names:
+            self.ppt_paths = file_names
+            self.file_label.setText(f"Selected: {os.path.basename(file_names[0])}" if len(file_names) == 1 else f"{len(file_names)} files selected")
+
+    def detections_for(self, path, progress=None, cancelled=None):
+        # Detection runs once per file for the session; every level and style is rendered from it.
+        # Only the job thread uses this cache.
+        key = (path, os.path.getmtime(path))
+        if key not in self.detections:
+            self.detections[key] = detect_ppt(path, progress=progress, cancelled=cancelled)
+        return self.detections[key]
+
+    def redact_one(self, path, level, style, variants, progress=None, cancelled=None):
+        """Runs on the job thread: detects (or reuses) one deck, then renders it and its variants."""
+        output_path = path.replace(".pptx", "_redacted.pptx")
+        detections = self.detections_for(path, progress, cancelled)
+        render_ppt(path, output_path, detections, level, style, cancelled=cancelled)
+        return [output_path] + redact_ppt_variants(path, variants, detections=detections, cancelled=cancelled)
 
     def redact_ppt(self):
-        if not self.ppt_path:
+        if not self.ppt_paths:
             QMessageBox.warning(self, "No File", "Please select a PowerPoint file first.")
             return
 
-        self.progress_bar.setVisible(True)
-        self.progress_bar.setValue(0)
+        level = self.slider.value()
+        style = "blackout"
+        if self.blur_button.isChecked():
+            style = "blur"
+        elif self.synthetic_button.isChecked():
+            style = "synthetic"
+
         try:
-            level = self.slider.value()
-            style = "blackout"
-            if self.blur_button.isChecked():
-                style = "blur"
-            elif self.synthetic_button.isChecked():
-                style = "synthetic"
-
-            output_path = self.ppt_path.replace(".pptx", "_redacted.pptx")
-            redact_ppt(self.ppt_path, output_path, level, style)
-            self.redacted_ppt_path = output_path
-            self.progress_bar.setValue(100)
-            self.download_button.setEnabled(True)
-            QMessageBox.information(self, "Success", f"Redaction completed! File saved at: {output_path}")
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"An error occurred: {str(e)}")
-        finally:
-            self.progress_bar.setVisible(False)
+            variants = parse_variants(self.variants_input.text())
+        except ValueError as e:
+            QMessageBox.warning(self, "Error", str(e))
+            return
+
+        for path in self.ppt_paths:
+            self.jobs.submit(Job(os.path.basename(path), self.redact_one, path, level, style, variants))
+
+    def redaction_finished(self):
+        self.status_label.setText(f"{self.jobs.summary()}; {describe(detection_cache.stats())}")
+        lines = []
+        for name, output_paths in self.jobs.finished:
+            self.redacted_ppt_path = output_paths[0]
+            lines.append(f"{name}: {', '.join(output_paths)}")
+        lines += [f"{name}: failed ({error})" for name, error in self.jobs.failed]
+        lines += [f"{name}: cancelled" for name in self.jobs.cancelled]
+
+        self.download_button.setEnabled(bool(self.redacted_ppt_path))
+        if self.jobs.failed:
+            QMessageBox.warning(self, "Error", "An error occurred for some files.\n\n" + "\n".join(lines))
+        else:
+            QMessageBox.information(self, "Success", "Redaction completed!\n\n" + "\n".join(lines))
+
+    def closeEvent(self, event):
+        self.jobs.shutdown()
+        super().closeEvent(event)
 
     def download_redacted_file(self):
         if self.redacted_ppt_path:
@@ -0,0 +1,144 @@
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from job_control import Cancelled
+
+
+class JobSignals(QObject):
+    # Emitted from the worker thread; Qt delivers them on the GUI thread
+    started = pyqtSignal()
+    progress = pyqtSignal(int, int)  # done, total (0 while the total is unknown)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+class Job(QRunnable):
+    """
+    Runs fn(*args, progress=..., cancelled=..., **kwargs) on a pool thread and
+    reports back through signals. cancel() asks fn to stop at its next check.
+    """
+
+    def __init__(self, name, fn, *args, **kwargs):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.name = name
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = JobSignals()
+        self.stop = threading.Event()
+
+    def cancel(self):
+        self.stop.set()
+
+    def report(self, done, total):
+        self.signals.progress.emit(done, total or 0)
+
+    def run(self):
+        if self.stop.is_set():
+            self.signals.cancelled.emit()
+            return
+        self.signals.started.emit()
+        try:
+            result = self.fn(*self.args, progress=self.report, cancelled=self.stop.is_set, **self.kwargs)
+        except Cancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+
+
+class JobQueue(QObject):
+    """
+    Queues jobs for a small pool of background threads, one at a time by
+    default since the engines share one loaded model, so the window stays
+    responsive while files are redacted. The running job is shown on an
+    optional progress bar and status label, and the outcomes of a batch are
+    collected until drained is emitted once every queued job has ended.
+    """
+
+    drained = pyqtSignal()
+
+    def __init__(self, parent=None, workers=1, progress_bar=None, status_label=None, cancel_button=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(workers)
+        self.progress_bar = progress_bar
+        self.status_label = status_label
+        self.cancel_button = cancel_button
+        if cancel_button is not None:
+            cancel_button.setEnabled(False)
+            cancel_button.clicked.connect(self.cancel_all)
+        self.jobs = []
+        self.reset()
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def reset(self):
+        """Forgets the outcomes of the previous batch."""
+        self.finished = []
+        self.failed = []
+        self.cancelled = []
+
+    def submit(self, job):
+        if not self.jobs:
+            self.reset()
+        self.jobs.append(job)
+        job.signals.started.connect(lambda: self._started(job))
+        job.signals.progress.connect(self._progress)
+        job.signals.finished.connect(lambda result: self._ended(job, self.finished, (job.name, result)))
+        job.signals.failed.connect(lambda error: self._ended(job, self.failed, (job.name, error)))
+        job.signals.cancelled.connect(lambda: self._ended(job, self.cancelled, job.name))
+        if self.cancel_button is not None:
+            self.cancel_button.setEnabled(True)
+        self.pool.start(job)
+        return job
+
+    def _started(self, job):
+        if self.progress_bar is not None:
+            self.progress_bar.setRange(0, 0)
+            self.progress_bar.setVisible(True)
+        if self.status_label is not None:
+            waiting = len(self.jobs) - 1
+            self.status_label.setText(f"Redacting {job.name}" + (f" ({waiting} more queued)" if waiting else ""))
+
+    def _progress(self, done, total):
+        if self.progress_bar is not None:
+            # A total of 0 keeps the bar in its busy state
+            self.progress_bar.setRange(0, total)
+            self.progress_bar.setValue(min(done, total) if total else 0)
+
+    def _ended(self, job, outcomes, outcome):
+        outcomes.append(outcome)
+        if job in self.jobs:
+            self.jobs.remove(job)
+        if self.jobs:
+            return
+        if self.progress_bar is not None:
+            self.progress_bar.setVisible(False)
+        if self.cancel_button is not None:
+            self.cancel_button.setEnabled(False)
+        if self.status_label is not None:
+            self.status_label.setText(self.summary())
+        self.drained.emit()
+
+    def summary(self):
+        parts = [f"{len(self.finished)} done"]
+        if self.failed:
+            parts.append(f"{len(self.failed)} failed")
+        if self.cancelled:
+            parts.append(f"{len(self.cancelled)} cancelled")
+        return ", ".join(parts)
+
+    def cancel_all(self):
+        for job in list(self.jobs):
+            job.cancel()
+
+    def shutdown(self):
+        """Cancels everything and waits for the running job to stop."""
+        self.cancel_all()
+        self.pool.waitForDone()
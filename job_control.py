@@ -0,0 +1,27 @@
+class Cancelled(Exception):
+    """Raised inside an engine once the caller has asked for its job to stop."""
+
+
+def report(progress, done, total=None):
+    """Calls progress(done, total) if a callback was given; total is None when it is not known."""
+    if progress is not None:
+        progress(done, total)
+
+
+def check_cancelled(cancelled):
+    """Raises Cancelled if the cancelled() callback says the job should stop."""
+    if cancelled is not None and cancelled():
+        raise Cancelled()
+
+
+def track(items, total=None, progress=None, cancelled=None):
+    """
+    Yields items one by one, checking for cancellation before each and
+    reporting progress once the caller has finished with it.
+    """
+    done = 0
+    for item in items:
+        check_cancelled(cancelled)
+        yield item
+        done += 1
+        report(progress, done, total)
@@ -1,47 +1,641 @@
+import argparse
+import gzip
+import io
+import json
+import mmap
 import os
-import re
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
 import pandas as pd
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QWidget, QLabel, QPushButton, QFileDialog, QSlider, QRadioButton, 
-    QButtonGroup, QMessageBox, QHBoxLayout, QFrame
+    QButtonGroup, QMessageBox, QHBoxLayout, QFrame, QLineEdit, QProgressBar
 )
 from PyQt5.QtCore import Qt
 
+from detectors import get_detector
+from gui_jobs import Job, JobQueue
+from job_control import Cancelled, check_cancelled, report, track
+from manifest import Manifest
+from replacer import resolve_overlaps, splice, splice_styled
+from variants import parse_variants, variant_path
+
+# Compressed formats that are read and written as streams
+COMPRESSIONS = ('gz', 'zst')
+
+# Minimum redaction scale at which each log pattern is redacted
+LOG_THRESHOLDS = [
+    (25, "IP"),
+    (50, "DATE"),
+    (75, "TIME"),
+    (100, "RELAY"),
+]
+
+# Rows per chunk when a CSV is streamed
+CSV_CHUNKSIZE = 100_000
+
+# Private-use characters that fence matches while Arrow columns are masked
+MATCH_START = "\ue000"
+MATCH_END = "\ue001"
+# Widths of the runs masked per pass, longest first; the last must be 1
+MASK_RUNS = (64, 32, 16, 8, 4, 2, 1)
+
+def labels_for_scale(redaction_scale):
+    """Returns the log labels that are redacted at a given redaction scale."""
+    return [label for threshold, label in LOG_THRESHOLDS if redaction_scale >= threshold]
+
 def redact_text(text, symbol="█"):
     """Redacts text with a given symbol."""
     return symbol * len(text)
 
 def redact_line(line, redaction_scale, option):
-    """Redacts sensitive information in a single line based on redaction scale."""
-    ip_pattern = r'\b(?:\d{1,3}\.){3}\d{1,3}\b'
-    date_pattern = r'\b\d{4}-\d{2}-\d{2}\b|\b\d{1,2}[A-Za-z]+\d{2}\b'
-    time_pattern = r'\b\d{2}:\d{2}:\d{2}\b'
-    relay_pattern = r'relay=.*?@.*? '
-
-    patterns = [
-        (25, ip_pattern),
-        (50, date_pattern),
-        (75, time_pattern),
-        (100, relay_pattern)
-    ]
-
-    for threshold, pattern in patterns:
-        if redaction_scale >= threshold:
-            matches = re.finditer(pattern, line)
-            for match in matches:
-                redacted = redact_text(match.group()) if option.lower() != 'blur' else redact_text(match.group(), "-")
-                line = line.replace(match.group(), redacted)
-
-    return line
-
-def redact_file(input_file, output_file, redaction_scale, option):
-    """Handles file redaction for .txt, .csv, .xlsx, and .11 formats."""
-    file_extension = input_file.split('.')[-1].lower()
-
-    if file_extension == 'csv':
-        df = pd.read_csv(input_file)
-        redacted_df = df.apply(lambda row: row.apply(lambda x: redact_line(str(x), redaction_scale, option) if isinstance(x, str) else x), axis=1)
-        redacted_df.to_csv(output_file, index=False)
+    """
+    Redacts sensitive information in a single line based on redaction scale.
+    Spans come from scan_each(), as for every other log path, so a direct run
+    and a render from detect_frame() give the same result.
+    """
+    detector = get_detector(labels_for_scale(redaction_scale), "log")
+    style = "blur" if option.lower() == 'blur' else "blackout"
+    return splice(line, detector.scan_each(line), style, blur_symbol="-")
+
+def redact_column(column, detector, option):
+    """
+    Redacts a whole string column, keeping value lengths. The compiled pattern
+    picks out the cells with any match in one pass over the column; only those
+    are spliced, from scan_each() like redact_line().
+    """
+    style = "blur" if option.lower() == 'blur' else "blackout"
+    # Non-string cells in an object column never match and are kept as they were
+    hits = column.str.contains(detector.regex, na=False).to_numpy(dtype=bool)
+    if not hits.any():
+        return column
+    redacted = column.copy()
+    redacted[hits] = [splice(value, detector.scan_each(value), style, blur_symbol="-") for value in column[hits]]
+    return redacted
+
+def redact_frame(df, redaction_scale, option):
+    """Redacts every string cell of a DataFrame, one whole column at a time."""
+    detector = get_detector(labels_for_scale(redaction_scale), "log")
+    if detector.regex is None:
+        return df
+
+    redacted = df.copy()
+    for name in df.columns:
+        # Numeric, boolean and datetime columns cannot hold log text
+        if df[name].dtype == object or pd.api.types.is_string_dtype(df[name]):
+            redacted[name] = redact_column(df[name], detector, option)
+    return redacted
+
+def detect_frame(df, progress=None, cancelled=None):
+    """
+    Scans every string cell of a DataFrame once, for all log labels. Returns
+    {column position: spans of each row}, from which render_frame() redacts
+    the frame at any scale and option without scanning it again.
+    progress(columns_done, column_count) is called after every column.
+    """
+    detector = get_detector(labels_for_scale(100), "log")
+    detections = {}
+    for position in track(range(len(df.columns)), len(df.columns), progress, cancelled):
+        column = df.iloc[:, position]
+        if column.dtype == object or pd.api.types.is_string_dtype(column):
+            detections[position] = [detector.scan_each(value) if isinstance(value, str) else [] for value in column]
+    return detections
+
+def render_frame(df, detections, redaction_scale, option, cancelled=None):
+    """Redacts a DataFrame at a redaction scale from the result of detect_frame()."""
+    labels = set(labels_for_scale(redaction_scale))
+    style = "blur" if option.lower() == 'blur' else "blackout"
+    redacted = df.copy()
+    for position, column_spans in detections.items():
+        check_cancelled(cancelled)
+        redacted.iloc[:, position] = [
+            splice(value, [span for span in spans if span[2] in labels], style, blur_symbol="-") if spans else value
+            for value, spans in zip(df.iloc[:, position], column_spans)
+        ]
+    return redacted
+
+def redact_frame_with_entries(df, redaction_scale, option, row_offset=0):
+    """
+    Redacts a DataFrame exactly like redact_frame() and also returns the
+    (row, column, start, end, label, style) manifest entries of what it
+    replaced. Only the cells that changed are scanned again, to find where.
+    """
+    style = "blur" if option.lower() == 'blur' else "blackout"
+    detector = get_detector(labels_for_scale(redaction_scale), "log")
+    redacted = redact_frame(df, redaction_scale, option)
+    entries = []
+    for position in range(len(df.columns)):
+        column = df.iloc[:, position]
+        changed = (column != redacted.iloc[:, position]).to_numpy().nonzero()[0]
+        for row in changed:
+            value = column.iat[row]
+            if isinstance(value, str):
+                # The same spans redact_column() spliced, merged the same way
+                entries.extend([row_offset + int(row), position, start, end, label, style]
+                               for start, end, label in resolve_overlaps(detector.scan_each(value)))
+    return redacted, entries
+
+def apply_frame_manifest(df, entries, row_offset=0):
+    """Redacts a DataFrame from (row, column, start, end, label, style) manifest entries."""
+    spans_by_cell = {}
+    for row, column, start, end, label, style in entries:
+        spans_by_cell.setdefault((row - row_offset, column), []).append((start, end, label, style))
+
+    redacted = df.copy()
+    for (row, column), spans in spans_by_cell.items():
+        redacted.iat[row, column] = splice_styled(df.iat[row, column], spans, blur_symbol="-")
+    return redacted
+
+def redact_csv_with_manifest(input_file, output_file, redaction_scale, option, manifest_path, chunksize=CSV_CHUNKSIZE,
+                             progress=None, cancelled=None):
+    """
+    Redacts a CSV with the column-wise engine of the plain CSV path, so the
+    output is the same, and records every redacted span in a manifest.
+    """
+    manifest = Manifest("log", input_file)
+    with open_stream(input_file, 'rt') as source, open_stream(output_file, 'wt') as out:
+        with pd.read_csv(source, chunksize=chunksize or CSV_CHUNKSIZE, dtype=str, keep_default_na=False) as reader:
+            row_offset = 0
+            for i, chunk in enumerate(track(reader, None, progress, cancelled)):
+                redacted, entries = redact_frame_with_entries(chunk, redaction_scale, option, row_offset)
+                redacted.to_csv(out, index=False, header=i == 0)
+                manifest.entries.extend(entries)
+                row_offset += len(chunk)
+    manifest.save(manifest_path)
+
+def apply_csv_manifest(input_file, manifest_path, output_file, chunksize=CSV_CHUNKSIZE):
+    """Redacts a CSV from a saved manifest, without scanning it."""
+    manifest = Manifest.load(manifest_path, "log")
+    manifest.check_source(input_file)
+    entries_by_chunk = {}
+    for entry in manifest.entries:
+        entries_by_chunk.setdefault(entry[0] // chunksize, []).append(entry)
+
+    with open_stream(input_file, 'rt') as source, open_stream(output_file, 'wt') as out:
+        with pd.read_csv(source, chunksize=chunksize, dtype=str, keep_default_na=False) as reader:
+            for i, chunk in enumerate(reader):
+                redacted = apply_frame_manifest(chunk, entries_by_chunk.get(i, []), i * chunksize)
+                redacted.to_csv(out, index=False, header=i == 0)
+
+def line_aligned_ranges(path, parts):
+    """Splits a file into at most `parts` byte ranges that each start and end on a line boundary."""
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+
+    bounds = [0]
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for i in range(1, parts):
+            newline = mm.find(b"\n", max(size * i // parts, bounds[-1]))
+            if newline == -1:
+                break
+            if newline + 1 < size:
+                bounds.append(newline + 1)
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+def redact_block(data, redaction_scale, option):
+    """Redacts a block of complete lines given as bytes and returns it encoded again."""
+    text = data.decode('utf-8', errors='surrogateescape')
+    # The log patterns never cross a newline, so a block of lines is redacted like one line
+    return redact_line(text, redaction_scale, option).encode('utf-8', errors='surrogateescape')
+
+def redact_byte_range(path, start, stop, redaction_scale, option):
+    """Redacts the lines in bytes [start, stop) of a text file and returns them encoded again."""
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        data = mm[start:stop]
+    return redact_block(data, redaction_scale, option)
+
+def redact_xlsx(input_file, output_file, redaction_scale, option, progress=None, cancelled=None):
+    """
+    Streams an .xlsx workbook through row by row, with a read-only source and
+    a write-only target, so memory stays flat for sheets with millions of rows.
+    String cells are redacted; numbers, dates and formulas are copied as they are.
+    """
+    try:
+        from openpyxl import Workbook, load_workbook
+    except ImportError:
+        raise RuntimeError("Redacting .xlsx files requires the openpyxl package.")
+
+    source = load_workbook(input_file, read_only=True)
+    target = Workbook(write_only=True)
+    rows_done = 0
+    try:
+        for sheet in source.worksheets:
+            target_sheet = target.create_sheet(title=sheet.title)
+            for row in sheet.iter_rows(values_only=True):
+                rows_done += 1
+                if rows_done % 10_000 == 0:
+                    check_cancelled(cancelled)
+                    report(progress, rows_done)
+                target_sheet.append([
+                    redact_line(value, redaction_scale, option)
+                    if isinstance(value, str) and not value.startswith('=') else value
+                    for value in row
+                ])
+        target.save(output_file)
+    finally:
+        source.close()
+
+def redact_arrow_strings(array, detector, option):
+    """
+    Redacts a string Arrow array with vectorized RE2 kernels, keeping value
+    lengths. Matches are first fenced with marker characters, then masked for
+    every match at once, and the markers dropped. Masking takes runs of
+    MASK_RUNS[0] characters per pass while any are left, then makes one pass
+    per shorter run, so a match of n characters costs about n / 64 + 7 passes.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if pa.types.is_dictionary(array.type):
+        # Only the distinct values need redacting; the indices are kept as they are
+        return pa.DictionaryArray.from_arrays(array.indices, redact_arrow_strings(array.dictionary, detector, option))
+
+    symbol = "-" if option.lower() == 'blur' else "█"
+    fenced = pc.replace_substring_regex(array, pattern=detector.regex.pattern,
+                                        replacement=MATCH_START + r"\0" + MATCH_END)
+    # The masked part of a match is moved in front of its start marker, so
+    # whatever follows the marker is still to be masked
+    def unmasked(run):
+        return f"{MATCH_START}[^{MATCH_END}]{{{run}}}"
+
+    longest = MASK_RUNS[0]
+    while pc.any(pc.match_substring_regex(fenced, pattern=unmasked(longest))).as_py():
+        fenced = pc.replace_substring_regex(fenced, pattern=unmasked(longest), replacement=symbol * longest + MATCH_START)
+    # Fewer than `longest` characters are left of any match; each shorter run takes its share at most once
+    for run in MASK_RUNS[1:]:
+        fenced = pc.replace_substring_regex(fenced, pattern=unmasked(run), replacement=symbol * run + MATCH_START)
+    return pc.replace_substring_regex(fenced, pattern=f"[{MATCH_START}{MATCH_END}]", replacement="")
+
+def is_arrow_string(data_type):
+    import pyarrow as pa
+
+    if pa.types.is_dictionary(data_type):
+        data_type = data_type.value_type
+    return pa.types.is_string(data_type) or pa.types.is_large_string(data_type)
+
+def redact_parquet(input_file, output_file, redaction_scale, option, progress=None, cancelled=None):
+    """
+    Redacts a Parquet file one row group at a time. String columns are
+    redacted with Arrow compute kernels, so no Python object is created per
+    cell, and every row group is written back with the original schema.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Redacting .parquet files requires the pyarrow package.")
+
+    detector = get_detector(labels_for_scale(redaction_scale), "log")
+    source = pq.ParquetFile(input_file)
+    schema = source.schema_arrow
+    with pq.ParquetWriter(output_file, schema) as writer:
+        for i in track(range(source.num_row_groups), source.num_row_groups, progress, cancelled):
+            table = source.read_row_group(i)
+            if detector.regex is not None:
+                columns = []
+                for field, column in zip(schema, table.columns):
+                    # Nested and non-string columns are copied unchanged
+                    if is_arrow_string(field.type):
+                        column = pa.chunked_array(
+                            [redact_arrow_strings(chunk, detector, option) for chunk in column.chunks],
+                            type=field.type,
+                        )
+                    columns.append(column)
+                table = pa.Table.from_arrays(columns, schema=schema)
+            writer.write_table(table)
+
+def split_extension(path):
+    """Returns the format and compression of a file name, e.g. ('log', 'gz') for 'mail.log.gz'."""
+    parts = os.path.basename(path).lower().split('.')
+    if len(parts) > 1 and parts[-1] in COMPRESSIONS:
+        return (parts[-2] if len(parts) > 2 else ''), parts[-1]
+    return (parts[-1] if len(parts) > 1 else ''), None
+
+def open_stream(path, mode='rb'):
+    """
+    Opens a file for reading or writing, (de)compressing .gz and .zst on the
+    fly. Binary modes return the byte stream, text modes ('rt', 'wt') wrap it
+    as UTF-8 text without newline translation.
+    """
+    binary_mode = mode.replace('t', '').replace('b', '') + 'b'
+    compression = split_extension(path)[1]
+    if compression == 'gz':
+        stream = gzip.open(path, binary_mode)
+    elif compression == 'zst':
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("Reading or writing .zst files requires the zstandard package.")
+        stream = zstandard.open(path, binary_mode)
+    else:
+        stream = open(path, binary_mode)
+
+    if 't' in mode:
+        return io.TextIOWrapper(stream, encoding='utf-8', newline='')
+    return stream
+
+def read_line_blocks(path, block_size):
+    """Yields blocks of complete lines, about block_size bytes each, from a possibly compressed file."""
+    with open_stream(path, 'rb') as source:
+        carry = b""
+        while True:
+            data = source.read(block_size)
+            if not data:
+                break
+            data = carry + data
+            end = data.rfind(b"\n") + 1
+            if end:
+                yield data[:end]
+            carry = data[end:]
+        if carry:
+            yield carry
+
+def prefetch(iterable, depth=4):
+    """
+    Runs an iterator on a background thread and hands its items over through a
+    bounded queue. When the consumer stops early, the producer is told to stop
+    and closes the iterator, so its thread and open file do not outlive the job.
+    """
+    items = queue.Queue(maxsize=depth)
+    done = object()
+    stop = threading.Event()
+    errors = []
+
+    def produce():
+        try:
+            for item in iterable:
+                if stop.is_set():
+                    break
+                items.put(item)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            if hasattr(iterable, 'close'):
+                iterable.close()
+            items.put(done)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = items.get()
+            if item is done:
+                break
+            yield item
+    finally:
+        stop.set()
+        # Keep taking items so a producer blocked on a full queue can finish
+        while producer.is_alive():
+            try:
+                items.get(timeout=0.1)
+            except queue.Empty:
+                pass
+    if errors:
+        raise errors[0]
+
+def write_blocks(path, blocks, depth=4):
+    """Writes blocks to a file; a .gz/.zst output is compressed on a background thread."""
+    if not split_extension(path)[1]:
+        with open(path, 'wb') as out:
+            for block in blocks:
+                out.write(block)
+        return
+
+    pending = queue.Queue(maxsize=depth)
+    errors = []
+
+    def consume():
+        try:
+            with open_stream(path, 'wb') as out:
+                while True:
+                    block = pending.get()
+                    if block is None:
+                        return
+                    out.write(block)
+        except Exception as e:
+            errors.append(e)
+            # Keep taking blocks so the producer is never left blocked
+            while pending.get() is not None:
+                pass
+
+    writer = threading.Thread(target=consume, daemon=True)
+    writer.start()
+    try:
+        for block in blocks:
+            pending.put(block)
+    finally:
+        pending.put(None)
+        writer.join()
+    if errors:
+        raise errors[0]
+
+def map_in_order(fn, arg_tuples, workers):
+    """
+    Yields fn(*args) for each tuple in arg_tuples, in order. With workers > 1 the
+    calls run on a process pool with only a few in flight, so memory stays
+    bounded however many blocks there are.
+    """
+    arg_tuples = iter(arg_tuples)
+    if workers <= 1:
+        for args in arg_tuples:
+            yield fn(*args)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque(pool.submit(fn, *args) for args in islice(arg_tuples, workers * 2))
+        while pending:
+            result = pending.popleft().result()
+            for args in islice(arg_tuples, 1):
+                pending.append(pool.submit(fn, *args))
+            yield result
+
+def redact_text_file(input_file, output_file, redaction_scale, option, workers=None, block_size=32 * 1024 * 1024,
+                     progress=None, cancelled=None):
+    """
+    Redacts a plain-text log line by line, in newline-aligned blocks of about
+    block_size bytes that a process pool redacts in parallel; blocks are
+    written back in their original order. An uncompressed input is
+    memory-mapped and split into byte ranges. A .gz/.zst input is decompressed
+    on a reader thread and a .gz/.zst output compressed on a writer thread, so
+    decompression, redaction and compression overlap without temporary files.
+    """
+    workers = workers or os.cpu_count() or 1
+
+    blocks = None
+    if split_extension(input_file)[1]:
+        blocks = prefetch(read_line_blocks(input_file, block_size))
+        redacted = map_in_order(redact_block, ((data, redaction_scale, option) for data in blocks), workers)
+        block_count = None
+    else:
+        size = os.path.getsize(input_file)
+        ranges = line_aligned_ranges(input_file, max(workers, -(-size // block_size)))
+        redacted = map_in_order(
+            redact_byte_range, ((input_file, start, stop, redaction_scale, option) for start, stop in ranges), workers
+        )
+        block_count = len(ranges)
+
+    try:
+        write_blocks(output_file, track(redacted, block_count, progress, cancelled))
+    finally:
+        # On cancellation or a worker error the reader thread is stopped right away
+        redacted.close()
+        if blocks is not None:
+            blocks.close()
+
+def load_checkpoint(checkpoint_file):
+    """Returns the saved follow position as {"inode": ..., "offset": ...}."""
+    try:
+        with open(checkpoint_file) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {"inode": None, "offset": 0}
+
+def save_checkpoint(checkpoint_file, inode, offset):
+    tmp_file = checkpoint_file + ".tmp"
+    with open(tmp_file, 'w') as f:
+        json.dump({"inode": inode, "offset": offset}, f)
+    os.replace(tmp_file, checkpoint_file)
+
+def redact_new_lines(source, out, offset, redaction_scale, option, read_size=8 * 1024 * 1024):
+    """Redacts the complete lines after offset in source, appends them to out and returns the new offset."""
+    source.seek(offset)
+    while True:
+        data = source.read(read_size)
+        end = data.rfind(b"\n") + 1
+        if not end:
+            break
+        text = data[:end].decode('utf-8', errors='surrogateescape')
+        out.write(redact_line(text, redaction_scale, option).encode('utf-8', errors='surrogateescape'))
+        offset += end
+        source.seek(offset)
+    out.flush()
+    return offset
+
+def follow_file(input_file, output_file, redaction_scale, option, checkpoint_file=None, poll_interval=1.0, stop=None):
+    """
+    Watches a growing log and appends the redacted form of every new complete
+    line to output_file. The byte offset reached is saved to checkpoint_file
+    (output_file + '.offset' by default), so a restart resumes without
+    rescanning. When the log is rotated, the rest of the old file is drained
+    before following the new one; a log truncated in place is read from the
+    start again. Runs until stop() returns true.
+    """
+    checkpoint_file = checkpoint_file or output_file + ".offset"
+    checkpoint = load_checkpoint(checkpoint_file)
+    source = None
+
+    with open(output_file, 'ab') as out:
+        try:
+            while stop is None or not stop():
+                if source is None:
+                    try:
+                        source = open(input_file, 'rb')
+                    except FileNotFoundError:
+                        time.sleep(poll_interval)
+                        continue
+                    stat = os.fstat(source.fileno())
+                    inode = stat.st_ino
+                    resume = checkpoint["inode"] == inode and checkpoint["offset"] <= stat.st_size
+                    offset = checkpoint["offset"] if resume else 0
+
+                offset = redact_new_lines(source, out, offset, redaction_scale, option)
+                save_checkpoint(checkpoint_file, inode, offset)
+
+                try:
+                    current = os.stat(input_file)
+                except FileNotFoundError:
+                    current = None
+
+                if current is None or current.st_ino != inode:
+                    # Rotated: drain whatever was appended to the old file before
+                    # the switch, including an unterminated tail, which ends the
+                    # line so the new file starts on its own
+                    offset = redact_new_lines(source, out, offset, redaction_scale, option)
+                    source.seek(offset)
+                    tail = source.read()
+                    if tail:
+                        text = tail.decode('utf-8', errors='surrogateescape')
+                        out.write(redact_line(text, redaction_scale, option).encode('utf-8', errors='surrogateescape'))
+                        if not text.endswith("\n"):
+                            out.write(b"\n")
+                        out.flush()
+                        offset += len(tail)
+                    save_checkpoint(checkpoint_file, inode, offset)
+                    source.close()
+                    source = None
+                    checkpoint = {"inode": None, "offset": 0}
+                elif current.st_size < offset:
+                    # Truncated in place (copytruncate rotation)
+                    offset = 0
+                    save_checkpoint(checkpoint_file, inode, offset)
+                else:
+                    time.sleep(poll_interval)
+        finally:
+            if source is not None:
+                source.close()
+
+def redact_file(input_file, output_file, redaction_scale, option, chunksize=CSV_CHUNKSIZE, workers=None, manifest_path=None,
+                progress=None, cancelled=None):
+    """
+    Handles file redaction for .txt, .csv, .xlsx, and .11 formats, plain or
+    compressed as .gz or .zst.
+
+    A CSV is streamed through in chunks of chunksize rows, so memory stays
+    bounded however large the file is; the output is the same as reading it
+    whole, which a chunksize of 0 or None does. Workbooks (.xlsx) are
+    streamed row by row and Parquet files one row group at a time. Plain-text
+    logs (.txt, .log) are redacted line by line on `workers` processes.
+
+    With manifest_path set, the redacted spans of a CSV are also written there
+    as a manifest that apply_csv_manifest() can replay.
+
+    progress(done, total) is called after every chunk, block or row group, with
+    total None where it is not known up front. Once cancelled() returns true
+    the job stops with Cancelled and the partial output is removed.
+    """
+    try:
+        _redact_file(input_file, output_file, redaction_scale, option, chunksize, workers, manifest_path, progress, cancelled)
+    except Cancelled:
+        if os.path.exists(output_file):
+            os.remove(output_file)
+        raise
+
+def _redact_file(input_file, output_file, redaction_scale, option, chunksize, workers, manifest_path, progress, cancelled):
+    file_extension = split_extension(input_file)[0]
+
+    if manifest_path and file_extension != 'csv':
+        raise ValueError("Manifests are only written for CSV logs.")
+
+    if file_extension == 'csv' and manifest_path:
+        redact_csv_with_manifest(input_file, output_file, redaction_scale, option, manifest_path, chunksize, progress, cancelled)
+    elif file_extension == 'csv':
+        # Cells are read as text, so every chunk is parsed the same way and
+        # unredacted values are written back exactly as they were
+        read_options = dict(dtype=str, keep_default_na=False)
+        with open_stream(input_file, 'rt') as source, open_stream(output_file, 'wt') as out:
+            if chunksize:
+                with pd.read_csv(source, chunksize=chunksize, **read_options) as reader:
+                    for i, chunk in enumerate(track(reader, None, progress, cancelled)):
+                        redact_frame(chunk, redaction_scale, option).to_csv(out, index=False, header=i == 0)
+            else:
+                check_cancelled(cancelled)
+                df = pd.read_csv(source, **read_options)
+                redact_frame(df, redaction_scale, option).to_csv(out, index=False)
+                report(progress, 1, 1)
+    elif file_extension == 'xlsx':
+        redact_xlsx(input_file, output_file, redaction_scale, option, progress, cancelled)
+    elif file_extension == 'parquet':
+        redact_parquet(input_file, output_file, redaction_scale, option, progress, cancelled)
+    elif file_extension in ('txt', 'log'):
+        redact_text_file(input_file, output_file, redaction_scale, option, workers=workers, progress=progress, cancelled=cancelled)
     else:
         print(f"Unsupported file format: {file_extension}")
         return
@@ -54,6 +648,7 @@ class LogRedactorApp(QMainWindow):
 
         self.setWindowTitle("Log Redactor - CSV File Redactor")
         self.setGeometry(100, 100, 800, 600)
+        self.detections = {}
         self.setStyleSheet("""
             QMainWindow { background-color: #2C2F33; }
             QLabel { color: white; font-size: 16px; }
@@ -131,11 +726,41 @@ class LogRedactorApp(QMainWindow):
         style_frame.setLayout(style_layout)
         layout.addWidget(style_frame)
 
+        # Batch Variants Frame
+        variants_frame = QFrame()
+        variants_layout = QVBoxLayout()
+
+        self.variants_label = QLabel("Extra Variants")
+        variants_layout.addWidget(self.variants_label)
+
+        self.variants_input = QLineEdit()
+        self.variants_input.setPlaceholderText("e.g. blackout-50, blur-100")
+        variants_layout.addWidget(self.variants_input)
+
+        variants_frame.setLayout(variants_layout)
+        layout.addWidget(variants_frame)
+
         # Redact Button
         self.redact_button = QPushButton("Redact")
         self.redact_button.clicked.connect(self.redact_file)
         layout.addWidget(self.redact_button)
 
+        # Progress Bar
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        layout.addWidget(self.progress_bar)
+
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+
+        self.cancel_button = QPushButton("Cancel")
+        layout.addWidget(self.cancel_button)
+
+        # Files are scanned on a background thread so the window stays responsive
+        self.jobs = JobQueue(self, progress_bar=self.progress_bar, status_label=self.status_label,
+                             cancel_button=self.cancel_button)
+        self.jobs.drained.connect(self.redaction_finished)
+
         # Download Button
         self.download_button = QPushButton("Download Redacted File")
         self.download_button.setEnabled(False)
@@ -152,6 +777,25 @@ class LogRedactorApp(QMainWindow):
             self.input_file = file_name
             self.file_label.setText(file_name)
 
+    def detections_for(self, path, progress=None, cancelled=None):
+        # The table is read and scanned once per file for the session; every
+        # scale and option is rendered from that. Only the job thread uses this cache.
+        key = (path, os.path.getmtime(path))
+        if key not in self.detections:
+            with open_stream(path, 'rt') as source:
+                df = pd.read_csv(source, dtype=str, keep_default_na=False)
+            self.detections[key] = (df, detect_frame(df, progress, cancelled))
+        return self.detections[key]
+
+    def redact_one(self, input_file, outputs, progress=None, cancelled=None):
+        """Runs on the job thread: scans (or reuses) one file, then renders every output of it."""
+        df, detections = self.detections_for(input_file, progress, cancelled)
+        for path, scale, style in outputs:
+            redacted = render_frame(df, detections, scale, style, cancelled)
+            with open_stream(path, 'wt') as out:
+                redacted.to_csv(out, index=False)
+        return [path for path, _, _ in outputs]
+
     def redact_file(self):
         if not hasattr(self, 'input_file'):
             QMessageBox.warning(self, "Error", "Please select a CSV file first.")
@@ -166,13 +810,28 @@ class LogRedactorApp(QMainWindow):
             QMessageBox.warning(self, "Error", "Please select a redaction style.")
             return
 
-        output_file = self.input_file.split('.')[0] + '_redacted.csv'
         try:
-            redact_file(self.input_file, output_file, redaction_scale, option)
+            variants = parse_variants(self.variants_input.text(), styles=("blackout", "blur"))
+        except ValueError as e:
+            QMessageBox.warning(self, "Error", str(e))
+            return
+
+        output_file = self.input_file.split('.')[0] + '_redacted.csv'
+        outputs = [(output_file, redaction_scale, option)]
+        outputs += [(variant_path(self.input_file.split('.')[0] + '.csv', style, level), level, style) for style, level in variants]
+        self.jobs.submit(Job(os.path.basename(self.input_file), self.redact_one, self.input_file, outputs))
+
+    def redaction_finished(self):
+        if self.jobs.failed:
+            QMessageBox.warning(self, "Error", f"An error occurred: {self.jobs.failed[-1][1]}")
+        elif self.jobs.finished:
             self.download_button.setEnabled(True)
-            QMessageBox.information(self, "Success", f"Redaction completed! File saved as: {output_file}")
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"An error occurred: {str(e)}")
+            saved = ', '.join(path for _, paths in self.jobs.finished for path in paths)
+            QMessageBox.information(self, "Success", f"Redaction completed! Files saved as: {saved}")
+
+    def closeEvent(self, event):
+        self.jobs.shutdown()
+        super().closeEvent(event)
 
     def download_redacted_file(self):
         if hasattr(self, 'input_file'):
@@ -184,7 +843,31 @@ class LogRedactorApp(QMainWindow):
                 QMessageBox.information(self, "Success", f"File saved successfully at {save_path}")
 
 if __name__ == "__main__":
-    app = QApplication([])
-    window = LogRedactorApp()
-    window.show()
-    app.exec_()
+    if len(sys.argv) > 1:
+        parser = argparse.ArgumentParser(description="Redact a log file, or keep redacting one as it grows.")
+        parser.add_argument("input_file")
+        parser.add_argument("output_file")
+        parser.add_argument("--scale", type=int, default=100, help="Redaction scale from 0 to 100")
+        parser.add_argument("--option", choices=["blackout", "blur"], default="blackout")
+        parser.add_argument("--chunksize", type=int, default=CSV_CHUNKSIZE,
+                            help="CSV rows read per chunk; 0 reads the whole file at once")
+        parser.add_argument("--follow", action="store_true", help="Follow the log and redact appended lines")
+        parser.add_argument("--manifest", help="Also write the redaction decisions to this manifest (CSV only)")
+        parser.add_argument("--apply-manifest", help="Redact from a saved manifest instead of scanning (CSV only)")
+        args = parser.parse_args()
+
+        if args.apply_manifest:
+            apply_csv_manifest(args.input_file, args.apply_manifest, args.output_file, args.chunksize or CSV_CHUNKSIZE)
+        elif args.follow:
+            try:
+                follow_file(args.input_file, args.output_file, args.scale, args.option)
+            except KeyboardInterrupt:
+                pass
+        else:
+            redact_file(args.input_file, args.output_file, args.scale, args.option, chunksize=args.chunksize,
+                        manifest_path=args.manifest)
+    else:
+        app = QApplication([])
+        window = LogRedactorApp()
+        window.show()
+        app.exec_()
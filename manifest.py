@@ -0,0 +1,88 @@
+import hashlib
+import json
+import os
+
+MANIFEST_VERSION = 1
+
+# Field order of the entries of each kind of manifest
+FIELDS = {
+    "pdf": ["page", "rect", "label", "style"],
+    "pptx": ["slide", "shape", "start", "end", "label", "style"],
+    "log": ["row", "column", "start", "end", "label", "style"],
+}
+
+# Styles the entries of each kind of manifest can be applied in
+STYLES = {
+    "pdf": ("blackout", "blur", "synthetic"),
+    "pptx": ("blackout", "blur", "synthetic"),
+    "log": ("blackout", "blur"),
+}
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class Manifest:
+    """
+    The redaction decisions of one run: where each redacted value sits in the
+    source, its label and the style it was redacted in. Original values are
+    never stored. A saved manifest can be edited by hand and applied to the
+    same source again without extraction or NER.
+    """
+
+    def __init__(self, kind, source, source_sha256=None, entries=None):
+        if kind not in FIELDS:
+            raise ValueError(f"Unknown manifest kind '{kind}'")
+        self.kind = kind
+        self.source = source
+        self.source_sha256 = source_sha256 if source_sha256 is not None else file_digest(source)
+        self.entries = entries if entries is not None else []
+
+    def add(self, *entry):
+        self.entries.append(list(entry))
+
+    def check_source(self, path):
+        """Raises ValueError if path is not the file this manifest was recorded from."""
+        if file_digest(path) != self.source_sha256:
+            raise ValueError(f"{path} does not match the file the manifest was recorded from ({self.source})")
+
+    def save(self, path):
+        # One entry per line keeps the file compact and easy to review or edit
+        header = {
+            "version": MANIFEST_VERSION,
+            "kind": self.kind,
+            "source": os.path.basename(self.source),
+            "source_sha256": self.source_sha256,
+            "fields": FIELDS[self.kind],
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(header, separators=(",", ":"))[:-1] + ',"entries":[\n')
+            f.write(",\n".join(json.dumps(entry, separators=(",", ":")) for entry in self.entries))
+            f.write("\n]}\n")
+
+    @classmethod
+    def load(cls, path, kind):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("kind") != kind:
+            raise ValueError(f"{path} is a '{data.get('kind')}' manifest, not '{kind}'")
+        if data.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported manifest version {data.get('version')} in {path}")
+        if data.get("fields") != FIELDS.get(data.get("kind")):
+            raise ValueError(f"Unexpected entry fields in {path}")
+        # Entries may have been edited by hand, so they are checked before anything is redacted
+        style_field = FIELDS[kind].index("style")
+        for number, entry in enumerate(data["entries"], 1):
+            if len(entry) != len(FIELDS[kind]):
+                raise ValueError(f"Entry {number} of {path} has {len(entry)} fields, expected {len(FIELDS[kind])}")
+            if entry[style_field] not in STYLES[kind]:
+                raise ValueError(
+                    f"Unknown style '{entry[style_field]}' in entry {number} of {path}, "
+                    f"expected one of: {', '.join(STYLES[kind])}"
+                )
+        return cls(data["kind"], data["source"], data["source_sha256"], data["entries"])
@@ -0,0 +1,62 @@
+import os
+import sys
+
+import spacy
+
+DEFAULT_MODEL = "en_core_web_sm"
+
+# Only doc.ents is ever read, so everything that is not NER can be left out
+UNUSED_COMPONENTS = ["tagger", "parser", "attribute_ruler", "lemmatizer", "senter", "morphologizer"]
+
+# Trimmed pipelines saved by build_artifact() live here, one directory per model
+ARTIFACT_DIR = os.environ.get("REDACT_MODEL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "models"))
+
+_loaded = {}
+
+
+def artifact_path(model=DEFAULT_MODEL):
+    return os.path.join(ARTIFACT_DIR, model + "-ner")
+
+
+def load_full(model=DEFAULT_MODEL):
+    """Loads a spaCy pipeline with every component enabled."""
+    return spacy.load(model)
+
+
+def load_trimmed(model=DEFAULT_MODEL):
+    """Loads a spaCy pipeline with only the components NER depends on."""
+    nlp = spacy.load(model, exclude=UNUSED_COMPONENTS)
+
+    # In the small English models NER carries its own embedding layer, in which
+    # case the shared tok2vec has no listeners left and is pure overhead.
+    if "tok2vec" in nlp.pipe_names and not nlp.get_pipe("tok2vec").listening_components:
+        nlp.remove_pipe("tok2vec")
+    return nlp
+
+
+def build_artifact(model=DEFAULT_MODEL):
+    """Serializes the trimmed pipeline to disk so later loads skip the unused weights."""
+    path = artifact_path(model)
+    load_trimmed(model).to_disk(path)
+    return path
+
+
+def load_nlp(model=DEFAULT_MODEL):
+    """
+    Returns the NER-only pipeline for a model, shared by every caller in the process.
+    A prebuilt artifact is preferred when one exists.
+    """
+    if model not in _loaded:
+        path = artifact_path(model)
+        _loaded[model] = spacy.load(path) if os.path.isdir(path) else load_trimmed(model)
+    return _loaded[model]
+
+
+def model_id(nlp):
+    """Identifies a loaded pipeline by name and version, for keying cached results."""
+    return f"{nlp.meta['lang']}_{nlp.meta['name']}-{nlp.meta['version']}"
+
+
+if __name__ == "__main__":
+    model = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_MODEL
+    print(f"Trimmed pipeline for {model} saved to {build_artifact(model)}")
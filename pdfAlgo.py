@@ -1,12 +1,15 @@
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QWidget, QLabel, QPushButton, QFileDialog, QSlider, QRadioButton, 
-    QButtonGroup, QMessageBox, QHBoxLayout, QFrame, QProgressBar
+    QButtonGroup, QMessageBox, QHBoxLayout, QFrame, QProgressBar, QLineEdit
 )
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont, QIcon
 import sys
 import os
 
+from detection_cache import describe
+from gui_jobs import Job, JobQueue
+from variants import parse_variants
 from pdf_redacter import PDFRedactor  # Assuming your `PDFRedactor` code is saved in a file named pdf_redacter.py
 
 class RedactApp(QMainWindow):
@@ -15,9 +18,10 @@ class RedactApp(QMainWindow):
 
         self.setWindowTitle("RE-DACT")
         self.setGeometry(100, 100, 800, 600)
-        self.pdf_path = None
+        self.pdf_paths = []
         self.redacted_pdf_path = None
         self.redactor = PDFRedactor()
+        self.detections = {}
 
         self.setStyleSheet("""
             QMainWindow { background-color: #2C2F33; }
@@ -100,6 +104,20 @@ class RedactApp(QMainWindow):
         style_frame.setLayout(style_layout)
         layout.addWidget(style_frame)
 
+        # Batch Variants Frame
+        variants_frame = QFrame()
+        variants_layout = QVBoxLayout()
+
+        self.variants_label = QLabel("Extra Variants")
+        variants_layout.addWidget(self.variants_label)
+
+        self.variants_input = QLineEdit()
+        self.variants_input.setPlaceholderText("e.g. blackout-50, synthetic-100")
+        variants_layout.addWidget(self.variants_input)
+
+        variants_frame.setLayout(variants_layout)
+        layout.addWidget(variants_frame)
+
         # Redact Button
         self.redact_button = QPushButton("Redact")
         self.redact_button.clicked.connect(self.redact_pdf)
@@ -111,6 +129,17 @@ class RedactApp(QMainWindow):
         self.progress_bar.setVisible(False)
         layout.addWidget(self.progress_bar)
 
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+
+        self.cancel_button = QPushButton("Cancel")
+        layout.addWidget(self.cancel_button)
+
+        # Files are redacted one after another on a background thread
+        self.jobs = JobQueue(self, progress_bar=self.progress_bar, status_label=self.status_label,
+                             cancel_button=self.cancel_button)
+        self.jobs.drained.connect(self.redaction_finished)
+
         # Download Button
         self.download_button = QPushButton("Download Redacted File")
         self.download_button.setIcon(QIcon("download-icon.png"))  # Replace with the path to an icon file
@@ -123,13 +152,28 @@ class RedactApp(QMainWindow):
 
     def choose_file(self):
         options = QFileDialog.Options()
-        file_name, _ = QFileDialog.getOpenFileName(self, "Choose PDF File", "", "PDF Files (*.pdf)", options=options)
-        if file_name:
-            self.pdf_path = file_name
-            self.file_label.setText(file_name)
+        file_names, _ = QFileDialog.getOpenFileNames(self, "Choose PDF Files", "", "PDF Files (*.pdf)", options=options)
+        if file_names:
+            self.pdf_paths = file_names
+            self.file_label.setText(file_names[0] if len(file_names) == 1 else f"{len(file_names)} files selected")
+
+    def detections_for(self, path, progress=None, cancelled=None):
+        # Detection runs once per file for the session; every level and style is rendered from it.
+        # Only the job thread uses this cache.
+        key = (path, os.path.getmtime(path))
+        if key not in self.detections:
+            self.detections[key] = self.redactor.detect_pdf(path, progress=progress, cancelled=cancelled)
+        return self.detections[key]
+
+    def redact_one(self, path, redact_level, action, variants, progress=None, cancelled=None):
+        """Runs on the job thread: detects (or reuses) one file, then renders it and its variants."""
+        detections = self.detections_for(path, progress, cancelled)
+        redacted_path = self.redactor.render_pdf(path, detections, redact_level, action, cancelled=cancelled)
+        variant_paths = self.redactor.redact_variants(path, variants, detections=detections, cancelled=cancelled)
+        return redacted_path, variant_paths
 
     def redact_pdf(self):
-        if not self.pdf_path:
+        if not self.pdf_paths:
             QMessageBox.warning(self, "Error", "Please select a PDF file first.")
             return
 
@@ -144,18 +188,34 @@ class RedactApp(QMainWindow):
             QMessageBox.warning(self, "Error", "Please select a redaction style.")
             return
 
-        self.progress_bar.setVisible(True)
-        self.progress_bar.setValue(30)  # Simulating progress
-
         try:
-            self.redacted_pdf_path = self.redactor.process_pdf(self.pdf_path, redact_level, action)
-            self.progress_bar.setValue(100)
-            QMessageBox.information(self, "Success", "PDF redacted successfully.")
-            self.download_button.setEnabled(True)
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Redaction failed: {e}")
-        finally:
-            self.progress_bar.setVisible(False)
+            variants = parse_variants(self.variants_input.text())
+        except ValueError as e:
+            QMessageBox.warning(self, "Error", str(e))
+            return
+
+        for path in self.pdf_paths:
+            self.jobs.submit(Job(os.path.basename(path), self.redact_one, path, redact_level, action, variants))
+
+    def redaction_finished(self):
+        self.status_label.setText(f"{self.jobs.summary()}; {describe(self.redactor.detection_cache.stats())}")
+        lines = []
+        for name, (redacted_path, variant_paths) in self.jobs.finished:
+            if redacted_path:
+                self.redacted_pdf_path = redacted_path
+            lines.append(f"{name}: " + ", ".join([redacted_path or "no sensitive data found"] + variant_paths))
+        lines += [f"{name}: failed ({error})" for name, error in self.jobs.failed]
+        lines += [f"{name}: cancelled" for name in self.jobs.cancelled]
+
+        self.download_button.setEnabled(bool(self.redacted_pdf_path))
+        if self.jobs.failed:
+            QMessageBox.critical(self, "Error", "Redaction failed for some files.\n\n" + "\n".join(lines))
+        else:
+            QMessageBox.information(self, "Success", "\n".join(lines) or "Nothing was redacted.")
+
+    def closeEvent(self, event):
+        self.jobs.shutdown()
+        super().closeEvent(event)
 
     def download_redacted_file(self):
         if not self.redacted_pdf_path:
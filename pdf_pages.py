@@ -0,0 +1,237 @@
+import os
+import shutil
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import fitz  # PyMuPDF
+
+BLACK = (0, 0, 0)
+WHITE = (1, 1, 1)
+BLUR_GRAY = (169 / 255, 169 / 255, 169 / 255)
+
+# Redacted pages written out before the output is reopened
+CHECKPOINT_PAGES = 200
+
+# Only text blocks are ever used, so images are neither decoded nor kept
+TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+
+def extract_page(page):
+    """
+    Parses a page once into its plain text and a glyph box for every
+    character, so detector offsets map straight to rectangles. Returns
+    (text, boxes) where boxes[i] is the bbox of text[i]; lines end with a
+    newline whose box is None.
+    """
+    parts = []
+    boxes = []
+    for block in page.get_text("rawdict", flags=TEXT_FLAGS)["blocks"]:
+        if block["type"] != 0:
+            continue
+        for line in block["lines"]:
+            for span in line["spans"]:
+                for char in span["chars"]:
+                    parts.append(char["c"])
+                    boxes.append(char["bbox"])
+            parts.append("\n")
+            boxes.append(None)
+    return "".join(parts), boxes
+
+
+def extract_spans(page):
+    """
+    Parses a page once and derives both its plain text and its span geometry
+    from that single result. Returns (text, spans) where every span is a dict
+    with its text, bbox and start offset in text; lines end with a newline.
+    """
+    parts = []
+    spans = []
+    offset = 0
+    for block in page.get_text("dict", flags=TEXT_FLAGS)["blocks"]:
+        if block["type"] != 0:
+            continue
+        for line in block["lines"]:
+            for span in line["spans"]:
+                spans.append({"text": span["text"], "bbox": span["bbox"], "start": offset})
+                parts.append(span["text"])
+                offset += len(span["text"])
+            parts.append("\n")
+            offset += 1
+    return "".join(parts), spans
+
+
+def rects_for_span(boxes, start, end):
+    """Turns the character range [start, end) into tight rectangles, one per line it covers."""
+    rects = []
+    current = None
+    for box in boxes[start:end]:
+        if box is None:
+            if current is not None:
+                rects.append(current)
+                current = None
+        elif current is None:
+            current = fitz.Rect(box)
+        else:
+            current |= box
+    if current is not None:
+        rects.append(current)
+    return rects
+
+
+class PageRedactions:
+    """
+    Collects the redaction rectangles of one page and applies them together,
+    so the page content stream is rewritten once instead of once per hit.
+    Overlapping or adjacent rectangles on the same line are merged first.
+    """
+
+    def __init__(self, page, tolerance=1.0):
+        self.page = page
+        self.tolerance = tolerance
+        self.items = []
+
+    def __bool__(self):
+        return bool(self.items)
+
+    def add(self, bbox, label=None, text=""):
+        self.items.append((fitz.Rect(bbox), label, text))
+
+    def _same_line(self, a, b):
+        overlap = min(a.y1, b.y1) - max(a.y0, b.y0)
+        return overlap > 0.5 * min(a.height, b.height)
+
+    def merged(self):
+        """Returns (rect, label, text) items, keeping the label and text of the first item of a merge."""
+        merged = []
+        for rect, label, text in sorted(self.items, key=lambda item: (item[0].y0, item[0].x0)):
+            if merged:
+                last_rect, last_label, last_text = merged[-1]
+                touching = rect.x0 <= last_rect.x1 + self.tolerance and last_rect.x0 <= rect.x1 + self.tolerance
+                if touching and (self._same_line(last_rect, rect) or last_rect.intersects(rect)):
+                    merged[-1] = (last_rect | rect, last_label, last_text)
+                    continue
+            merged.append((fitz.Rect(rect), label, text))
+        return merged
+
+    def apply(self, fill=BLACK, replacement=None):
+        """
+        Adds one redaction annotation per merged rectangle and applies them all
+        with a single apply_redactions() call. replacement(text, label), if
+        given, returns the text written into each redacted area.
+        """
+        merged = self.merged()
+        for rect, label, text in merged:
+            if replacement is None:
+                self.page.add_redact_annot(rect, fill=fill)
+            else:
+                self.page.add_redact_annot(rect, fill=fill, text=replacement(text, label))
+        if merged:
+            self.page.apply_redactions()
+        return merged
+
+    def blackout(self):
+        self.apply(fill=BLACK)
+
+    def blur(self):
+        # A semi-transparent gray overlay, drawn as one shape for the whole page
+        merged = self.merged()
+        if not merged:
+            return
+        shape = self.page.new_shape()
+        for rect, _, _ in merged:
+            shape.draw_rect(rect)
+        shape.finish(color=BLUR_GRAY, fill=BLUR_GRAY, fill_opacity=0.5)
+        shape.commit()
+
+    def synthetic(self, generate, fontsize=12):
+        """Removes the original text and writes generate(text, label) in its place."""
+        for rect, label, text in self.apply(fill=WHITE):
+            self.page.insert_text((rect.x0, rect.y1 - 5), generate(text, label), fontsize=fontsize, color=BLACK)
+
+
+class RedactedOutput:
+    """
+    The redacted copy of a PDF, written to disk every `checkpoint` redacted
+    pages and reopened, so the rewritten content of redacted pages is not all
+    held in memory until the end. The working copy only gains incremental
+    updates; finish() rewrites it with garbage collection into output_path,
+    which drops the superseded objects that still hold the original text.
+    """
+
+    def __init__(self, source_path, output_path, checkpoint=CHECKPOINT_PAGES):
+        self.output_path = output_path
+        self.work_path = output_path + ".part"
+        self.checkpoint = checkpoint
+        self.pending = 0
+        shutil.copyfile(source_path, self.work_path)
+        self.doc = fitz.open(self.work_path)
+
+    def load_page(self, page_number):
+        return self.doc.load_page(page_number)
+
+    def page_done(self):
+        """Call after a page has been redacted."""
+        self.pending += 1
+        if self.pending >= self.checkpoint and self.doc.can_save_incrementally():
+            self.doc.saveIncr()
+            self.doc.close()
+            self.doc = fitz.open(self.work_path)
+            self.pending = 0
+
+    def finish(self):
+        self.doc.save(self.output_path, garbage=3, deflate=True)
+        self.discard()
+        return self.output_path
+
+    def discard(self):
+        self.doc.close()
+        if os.path.exists(self.work_path):
+            os.remove(self.work_path)
+
+
+def page_ranges(page_count, parts):
+    """Splits range(page_count) into at most `parts` contiguous (start, stop) ranges."""
+    parts = max(1, min(parts, page_count))
+    size, extra = divmod(page_count, parts)
+    ranges = []
+    start = 0
+    for i in range(parts):
+        stop = start + size + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def _plan_range(plan_page, pdf_path, start, stop):
+    with fitz.open(pdf_path) as doc:
+        return [plan_page(doc.load_page(page_num)) for page_num in range(start, stop)]
+
+
+def iter_page_plans(doc, plan_page, workers=1):
+    """
+    Yields (page, plan_page(page)) for every page of an open document, in page
+    order, so callers can redact and drop each page before the next one is
+    extracted. With workers > 1 the pages are split into ranges that a process
+    pool plans from its own handle on doc.name; plan_page must then be
+    picklable (a module-level function or a partial of one). Only a few ranges
+    are in flight at a time, which keeps memory flat on long documents.
+    """
+    if workers <= 1 or doc.page_count < 2:
+        for page in doc:
+            yield page, plan_page(page)
+        return
+
+    # A few ranges per worker keeps the pool busy when some pages are denser
+    ranges = iter(page_ranges(doc.page_count, workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for start, stop in islice(ranges, workers * 2):
+            pending.append((start, pool.submit(_plan_range, plan_page, doc.name, start, stop)))
+
+        while pending:
+            start, future = pending.popleft()
+            for start_next, stop_next in islice(ranges, 1):
+                pending.append((start_next, pool.submit(_plan_range, plan_page, doc.name, start_next, stop_next)))
+            for offset, plan in enumerate(future.result()):
+                yield doc.load_page(start + offset), plan
@@ -1,143 +1,273 @@
 import fitz  # PyMuPDF
-import spacy
+from nlp_loader import load_nlp, model_id
 import os
-import re
-from faker import Faker
+from functools import partial
+
+from detection_cache import DetectionCache
+from detectors import get_detector, policy_id
+from job_control import track
+from manifest import Manifest
+from pdf_pages import PageRedactions, RedactedOutput, extract_page, iter_page_plans, rects_for_span
+from pseudonyms import PseudonymCache
+from replacer import replacement_for
+from span_index import EntityIndex
+import synthetic
+from variants import variant_path
+
+NER_LABELS = ['PERSON', 'GPE', 'ORG', 'DATE', 'MONEY']
+REGEX_LABELS = ['EMAIL', 'PHONE', 'IP', 'IPV6']
+
+# Action codes of the redaction styles
+ACTIONS = {'blur': 'b', 'blackout': 'x', 'synthetic': 's'}
+STYLES = {action: style for style, action in ACTIONS.items()}
 
 class PDFRedactor:
     def __init__(self):
-        self.nlp = spacy.load("en_core_web_sm")
-        self.fake = Faker()
+        self.nlp = load_nlp()
+        self.detection_cache = DetectionCache(model_id(self.nlp))
+        self.pseudonyms = PseudonymCache(self.generate_synthetic_data)
 
     def extract_text_and_coordinates(self, pdf_path):
-        doc = fitz.open(pdf_path)
-        text = ""
-        blocks = []
-
-        for page_num in range(len(doc)):
-            page = doc.load_page(page_num)
-            text += page.get_text("text")
-            for block in page.get_text("dict")["blocks"]:
-                if block['type'] == 0:
-                    for line in block["lines"]:
-                        for span in line["spans"]:
-                            blocks.append({
-                                "text": span["text"],
-                                "bbox": span["bbox"],
-                                "page_num": page_num,
-                            })
-        return text, blocks
+        """Yields (text, boxes) one page at a time, with a glyph box per character of text."""
+        with fitz.open(pdf_path) as doc:
+            for page in doc:
+                yield extract_page(page)
 
     def extract_sensitive_data(self, text):
+        # Pages that repeat (cover sheets, disclaimers) skip NER after the first time
+        policy = policy_id(NER_LABELS + REGEX_LABELS)
+        return self.detection_cache.detect_many([text], policy, lambda texts: [self.detect_sensitive_data(texts[0])])[0]
+
+    def detect_sensitive_data(self, text):
         doc = self.nlp(text)
         sensitive_data = []
 
         for ent in doc.ents:
-            if ent.label_ in ['PERSON', 'GPE', 'ORG', 'DATE', 'MONEY']:
-                sensitive_data.append((ent.start, ent.end, ent.text, ent.label_))
-
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b'
-        phone_pattern = r'\b(\+?[0-9]{1,3})?[-. ]?(\(?\d{3}\)?[-. ]?\d{3}[-. ]?\d{4})\b'
-        ipv4_pattern = r'\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b'
-        ipv6_pattern = r'\b(?:[A-Fa-f0-9]{1,4}:){7}[A-Fa-f0-9]{1,4}\b'
-
-        emails = re.findall(email_pattern, text)
-        phones = re.findall(phone_pattern, text)
-        ipv4s = re.findall(ipv4_pattern, text)
-        ipv6s = re.findall(ipv6_pattern, text)
-
-        for email in emails:
-            sensitive_data.append((0, 0, email, 'EMAIL'))
-        for phone in phones:
-            sensitive_data.append((0, 0, phone[1], 'PHONE'))
-        for ipv4 in ipv4s:
-            sensitive_data.append((0, 0, ipv4, 'IPV4'))
-        for ipv6 in ipv6s:
-            sensitive_data.append((0, 0, ipv6, 'IPV6'))
+            if ent.label_ in NER_LABELS:
+                sensitive_data.append((ent.start_char, ent.end_char, ent.text, ent.label_))
+
+        for start, end, label in get_detector(REGEX_LABELS).scan(text):
+            sensitive_data.append((start, end, text[start:end], label))
 
         return sensitive_data
 
     def generate_synthetic_data(self, label):
-        if label == 'EMAIL':
-            return self.fake.email()
-        elif label == 'PHONE':
-            return self.fake.phone_number()
-        elif label == 'PERSON':
-            return self.fake.name()
-        elif label == 'GPE':
-            return self.fake.city()
-        elif label == 'ORG':
-            return self.fake.company()
-        elif label == 'DATE':
-            return self.fake.date()
-        elif label == 'MONEY':
-            return self.fake.pricetag()
-        elif label == 'IPV4':
-            return self.fake.ipv4()
-        elif label == 'IPV6':
-            return self.fake.ipv6()
-        else:
-            return "SYNTHETIC_DATA"
-
-    def redact_blackout(self, page, bbox):
-        x0, y0, x1, y1 = bbox
-        rect = fitz.Rect(x0, y0, x1, y1)
-        page.add_redact_annot(rect, fill=(0, 0, 0))
-        page.apply_redactions()
-
-    def redact_blur(self, page, bbox):
-        x0, y0, x1, y1 = bbox
-        rect = fitz.Rect(x0, y0, x1, y1)
-        blur_color = (169 / 255, 169 / 255, 169 / 255, 0.5)
-        page.draw_rect(rect, color=blur_color, fill=True)
-
-    def replace_with_synthetic_data(self, page, bbox, label):
-        synthetic_text = self.generate_synthetic_data(label)
-        x0, y0, x1, y1 = bbox
-        rect = fitz.Rect(x0, y0, x1, y1)
-        page.draw_rect(rect, color=(1, 1, 1), fill=True)
-        page.insert_text((x0, y1 - 5), synthetic_text, fontsize=12, color=(0, 0, 0))
-
-    def process_pdf(self, pdf_path, redact_level, action):
-        pdf_text, blocks = self.extract_text_and_coordinates(pdf_path)
-        sensitive_data = self.extract_sensitive_data(pdf_text)
-
-        if not sensitive_data:
-            print("No sensitive data found.")
-            return
+        return synthetic.draw(label, "SYNTHETIC_DATA")
 
-        doc = fitz.open(pdf_path)
+    def redact_blackout(self, redactions):
+        redactions.blackout()
+
+    def redact_blur(self, redactions):
+        redactions.blur()
+
+    def replace_with_synthetic_data(self, redactions):
+        redactions.synthetic(
+            lambda sensitive_text, label: replacement_for(sensitive_text, label, "synthetic", self.pseudonyms.get)
+        )
+
+    def apply_redactions(self, redactions, action):
+        if action == 'b':
+            self.redact_blur(redactions)
+        elif action == 'x':
+            self.redact_blackout(redactions)
+        elif action == 's':
+            self.replace_with_synthetic_data(redactions)
+
+    def entities_for_level(self, redact_level):
         entities_to_redact = set()
 
         # Adjust redaction levels based on sensitivity
         if redact_level >= 25:
-            entities_to_redact.update(['EMAIL', 'PHONE', 'IPV4', 'IPV6'])
+            entities_to_redact.update(['EMAIL', 'PHONE', 'IP', 'IPV6'])
         if redact_level >= 50:
             entities_to_redact.update(['DATE'])
         if redact_level >= 75:
             entities_to_redact.update(['MONEY', 'ORG', 'GPE'])  # Redact city names (GPE)
         if redact_level == 100:
             entities_to_redact.update(['PERSON'])
+        return entities_to_redact
+
+    def detect_page(self, page):
+        """
+        Extracts and detects one page for every label, returning (rect, labels,
+        text) for each area a detected value covers. labels holds every label
+        the value was detected under, so the result can be narrowed to any level.
+        """
+        page_text, boxes = extract_page(page)
+
+        labels_by_text = {}
+        for _, _, sensitive_text, label in self.extract_sensitive_data(page_text):
+            labels = labels_by_text.setdefault(sensitive_text, [])
+            if label not in labels:
+                labels.append(label)
+        if not labels_by_text:
+            return []
+
+        # Every occurrence of a detected value on the page is redacted, found
+        # with one automaton pass over the page text
+        index = EntityIndex((sensitive_text, tuple(labels)) for sensitive_text, labels in labels_by_text.items())
+
+        detections = []
+        for start, end, labels in index.finditer(page_text):
+            for rect in rects_for_span(boxes, start, end):
+                detections.append((tuple(rect), labels, page_text[start:end]))
+        return detections
+
+    def plan_page(self, page, entities_to_redact):
+        """Extracts and detects one page, returning the (rect, label, text) areas to redact."""
+        return plan_for_entities(self.detect_page(page), entities_to_redact)
+
+    def detect_pdf(self, pdf_path, workers=1, progress=None, cancelled=None):
+        """
+        Detects every page of a PDF once, for all labels. render_pdf() turns the
+        result into any redaction level and style without running NER again.
+        progress(pages_done, page_count) is called after every page, and the
+        run stops with Cancelled once cancelled() returns true.
+        """
+        detect_page = _detect_page_in_worker if workers > 1 else self.detect_page
+        with fitz.open(pdf_path) as doc:
+            page_plans = track(iter_page_plans(doc, detect_page, workers), doc.page_count, progress, cancelled)
+            return [detections for _, detections in page_plans]
+
+    def render_pdf(self, pdf_path, detections, redact_level, action, output_path=None, manifest_path=None,
+                   progress=None, cancelled=None):
+        entities_to_redact = self.entities_for_level(redact_level)
+        doc = fitz.open(pdf_path)
+        page_plans = (
+            (page, plan_for_entities(page_detections, entities_to_redact))
+            for page, page_detections in zip(doc, detections)
+        )
+        return self.save_redacted(doc, pdf_path, page_plans, action, output_path, manifest_path, progress, cancelled)
+
+    def redact_variants(self, pdf_path, variants, workers=1, detections=None, cancelled=None):
+        """Writes one redacted copy per (style, level) variant from a single detection pass."""
+        if detections is None:
+            detections = self.detect_pdf(pdf_path, workers, cancelled=cancelled)
+        output_paths = []
+        for style, level in variants:
+            output_path = self.render_pdf(
+                pdf_path, detections, level, ACTIONS[style], variant_path(pdf_path, style, level), cancelled=cancelled
+            )
+            if output_path:
+                output_paths.append(output_path)
+        return output_paths
+
+    def process_pdf(self, pdf_path, redact_level, action, workers=1, manifest_path=None, output_path=None,
+                    progress=None, cancelled=None):
+        entities_to_redact = self.entities_for_level(redact_level)
+
+        # Pages are extracted and detected independently, in worker processes
+        # when workers > 1; redactions are then applied here in page order so
+        # the output does not depend on the worker count.
+        if workers > 1:
+            plan_page = partial(_plan_page_in_worker, entities_to_redact=entities_to_redact)
+        else:
+            plan_page = partial(self.plan_page, entities_to_redact=entities_to_redact)
+
+        # Each page is extracted, detected and redacted before the next one is
+        # read, and redacted pages are flushed to disk every few hundred, so
+        # memory does not grow with the length of the document
+        doc = fitz.open(pdf_path)
+        return self.save_redacted(
+            doc, pdf_path, iter_page_plans(doc, plan_page, workers), action, output_path, manifest_path, progress, cancelled
+        )
+
+    def save_redacted(self, doc, pdf_path, page_plans, action, output_path=None, manifest_path=None,
+                      progress=None, cancelled=None):
+        """
+        Applies (page, plan) pairs in page order and saves the result, or returns
+        None if nothing was found. With manifest_path, the decisions are also
+        written there as a manifest. progress(pages_done, page_count) is called
+        after every page, and the run stops with Cancelled once cancelled()
+        returns true.
+        """
+        manifest = Manifest("pdf", pdf_path) if manifest_path else None
+        if output_path is None:
+            output_path = os.path.join(os.path.dirname(pdf_path), "redacted_" + os.path.basename(pdf_path))
+
+        # Pages are planned from doc and redacted in a separate output copy
+        # that is flushed to disk as it goes
+        output = RedactedOutput(pdf_path, output_path)
+        found = False
+        try:
+            for page, plan in track(page_plans, doc.page_count, progress, cancelled):
+                if manifest is not None:
+                    for bbox, label, _ in plan:
+                        manifest.add(page.number, [round(value, 2) for value in bbox], label, STYLES[action])
+                if not plan:
+                    continue
+                found = True
+
+                # All hits of a page are applied together
+                redactions = PageRedactions(output.load_page(page.number))
+                for bbox, label, sensitive_text in plan:
+                    redactions.add(bbox, label, sensitive_text)
+                self.apply_redactions(redactions, action)
+                output.page_done()
+        except BaseException:
+            output.discard()
+            raise
+        finally:
+            doc.close()
+
+        if manifest is not None:
+            manifest.save(manifest_path)
+        if not found:
+            output.discard()
+            print("No sensitive data found.")
+            return
+        return output.finish()
+
+    def apply_manifest(self, pdf_path, manifest_path, output_path=None):
+        """Redacts a PDF from a saved manifest, without extraction or NER."""
+        manifest = Manifest.load(manifest_path, "pdf")
+        manifest.check_source(pdf_path)
+        items_by_page = {}
+        for page_number, rect, label, style in manifest.entries:
+            items_by_page.setdefault((page_number, style), []).append((rect, label))
+
+        doc = fitz.open(pdf_path)
+        # Blur is only an overlay, so it is drawn after the styles that remove text
+        for (page_number, style), items in sorted(items_by_page.items(), key=lambda item: (item[0][0], item[0][1] == 'blur')):
+            page = doc.load_page(page_number)
+            redactions = PageRedactions(page)
+            for rect, label in items:
+                # Synthetic values are keyed by the original text, read back from the page
+                sensitive_text = page.get_textbox(rect).strip() if style == 'synthetic' else ""
+                redactions.add(rect, label, sensitive_text)
+            self.apply_redactions(redactions, ACTIONS[style])
+
+        if output_path is None:
+            output_path = os.path.join(os.path.dirname(pdf_path), "redacted_" + os.path.basename(pdf_path))
+        # Same options as RedactedOutput.finish(), so redacted text is dropped from the file
+        doc.save(output_path, garbage=3, deflate=True)
+        doc.close()
+        return output_path
+
+
+def plan_for_entities(detections, entities_to_redact):
+    """Narrows a page's detections to the labels being redacted, as (rect, label, text) items."""
+    plan = []
+    for rect, labels, sensitive_text in detections:
+        label = next((label for label in labels if label in entities_to_redact), None)
+        if label is not None:
+            plan.append((rect, label, sensitive_text))
+    return plan
+
 
-        # Filter the sensitive data based on redact level
-        filtered_data = [data for data in sensitive_data if data[3] in entities_to_redact]
+# Each pool worker loads the model once and reuses it for all of its pages
+_worker_redactor = None
 
-        for _, _, sensitive_text, label in filtered_data:
-            # Iterate through all pages and check for the matching block
-            for block in blocks:
-                if sensitive_text in block["text"]:
-                    bbox = block["bbox"]
-                    page_num = block["page_num"]
-                    page = doc.load_page(page_num)
 
-                    if action == 'b':
-                        self.redact_blur(page, bbox)
-                    elif action == 'x':
-                        self.redact_blackout(page, bbox)
-                    elif action == 's':
-                        self.replace_with_synthetic_data(page, bbox, label)
+def _plan_page_in_worker(page, entities_to_redact):
+    global _worker_redactor
+    if _worker_redactor is None:
+        _worker_redactor = PDFRedactor()
+    return _worker_redactor.plan_page(page, entities_to_redact)
 
-        redacted_pdf_path = os.path.join(os.path.dirname(pdf_path), "redacted_" + os.path.basename(pdf_path))
-        doc.save(redacted_pdf_path)
-        return redacted_pdf_path
 
+def _detect_page_in_worker(page):
+    global _worker_redactor
+    if _worker_redactor is None:
+        _worker_redactor = PDFRedactor()
+    return _worker_redactor.detect_page(page)
@@ -1,36 +1,43 @@
 import sys
 import os
 import fitz  # PyMuPDF
-import re
 from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QComboBox, QLabel, QFileDialog, QLineEdit
 
+from detectors import get_detector
+from pdf_pages import PageRedactions, extract_page, iter_page_plans, rects_for_span
+from replacer import replacement_for
+
+SENSITIVE_LABELS = ["EMAIL", "PHONE", "DATE"]
+
+def get_sensitive_spans(text):
+    """
+    Function to find sensitive data such as emails, phone numbers, and dates as (start, end, label) offsets.
+    """
+    return get_detector(SENSITIVE_LABELS).scan(text)
+
+
 def get_sensitive_data(lines):
     """
     Function to get all lines containing sensitive data such as emails, phone numbers, and dates.
     """
-    EMAIL_REG = r"([\w\.\d]+@[\w\d]+\.[\w\d]+)"
-    PHONE_REG = r"(\+?\d{1,3}[\s-]?)?(\(?\d{3}\)?[\s-]?)?\d{3}[\s-]?\d{4}"
-    DATE_REG = r"(\d{2}[-/]\d{2}[-/]\d{4}|\d{4}[-/]\d{2}[-/]\d{2}|\d{2}[\s/]\d{2}[\s/]\d{4}|" \
-               r"\d{2}\s[A-Za-z]+\s\d{4})"
-
     for line in lines:
-        if re.search(EMAIL_REG, line, re.IGNORECASE):
-            search = re.search(EMAIL_REG, line, re.IGNORECASE)
-            if search:
-                yield "EMAIL", search.group(1)
+        for start, end, label in get_sensitive_spans(line):
+            yield label, line[start:end]
 
-        if re.search(PHONE_REG, line):
-            search = re.search(PHONE_REG, line)
-            if search:
-                yield "PHONE", search.group(0)
 
-        if re.search(DATE_REG, line):
-            search = re.search(DATE_REG, line)
-            if search:
-                yield "DATE", search.group(0)
+def plan_page(page):
+    """
+    Finds the areas to redact on one page as (rect, label, text) tuples.
+    """
+    text, boxes = extract_page(page)
+    plan = []
+    for start, end, label in get_sensitive_spans(text):
+        for rect in rects_for_span(boxes, start, end):
+            plan.append((tuple(rect), label, text[start:end]))
+    return plan
 
 
-def redact_pdf(path, mode='blackout'):
+def redact_pdf(path, mode='blackout', workers=1):
     """
     Redact sensitive data in the PDF.
     """
@@ -39,17 +46,15 @@ def redact_pdf(path, mode='blackout'):
         return
 
     doc = fitz.open(path)
-    for page_number, page in enumerate(doc):
-        text = page.get_text("text")
-        sensitive_data = get_sensitive_data(text.split('\n'))
-        for label, data in sensitive_data:
-            areas = page.search_for(data)
-            for area in areas:
-                if mode == 'blur':
-                    page.add_redact_annot(area, fill=(0, 0, 0), text='*' * len(data))
-                else:
-                    page.add_redact_annot(area, fill=(0, 0, 0))
-        page.apply_redactions()
+    for page, plan in iter_page_plans(doc, plan_page, workers):
+        redactions = PageRedactions(page)
+        for area, label, data in plan:
+            redactions.add(area, label, data)
+
+        if mode == 'blur':
+            redactions.apply(replacement=lambda data, label: replacement_for(data, label, 'blur'))
+        else:
+            redactions.apply()
 
     output_path = 'redacted.pdf'
     doc.save(output_path)
@@ -0,0 +1,105 @@
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from sqlite_store import open_store
+
+# Set to a file path to keep pseudonyms across runs and share them between processes
+STORE_PATH = os.environ.get("REDACT_PSEUDONYM_DB")
+# Secret the stored rows are keyed with; by default a random key kept beside the store
+KEY_ENV = "REDACT_PSEUDONYM_KEY"
+KEY_BYTES = 32
+
+
+def load_key(path):
+    """
+    Returns the secret for the store at path: REDACT_PSEUDONYM_KEY if set,
+    otherwise the key in path + '.key', created on first use and readable by
+    its owner only. Other processes sharing the store read the same file.
+    """
+    secret = os.environ.get(KEY_ENV)
+    if secret:
+        return secret.encode("utf-8")
+
+    key_path = path + ".key"
+    try:
+        fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        # Another process may still be writing it
+        for _ in range(50):
+            with open(key_path, "rb") as f:
+                key = f.read()
+            if len(key) == KEY_BYTES:
+                return key
+            time.sleep(0.1)
+        raise RuntimeError(f"{key_path} does not hold a {KEY_BYTES}-byte pseudonym key")
+    key = secrets.token_bytes(KEY_BYTES)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    return key
+
+
+class PseudonymCache:
+    """
+    Maps each (label, original value) to one synthetic value, so a repeated
+    entity costs a dictionary lookup and is replaced the same way everywhere.
+    Recently used entries are kept in memory up to maxsize; with a store path
+    every pseudonym is also saved to a SQLite file shared across runs and
+    processes. The file never holds original values: each row is keyed by an
+    HMAC of the label and original value under a secret kept outside it.
+    """
+
+    def __init__(self, generate, maxsize=100_000, path=STORE_PATH):
+        # generate(label) returns a fresh synthetic value for a label
+        self.generate = generate
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.store = None
+        if path:
+            self.secret = load_key(path)
+            self.store = open_store(path)
+            self.store.execute("CREATE TABLE IF NOT EXISTS pseudonym_digests (digest TEXT PRIMARY KEY, pseudonym TEXT)")
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, label, original):
+        """Returns the pseudonym of original, generating and remembering one on first sight."""
+        key = (label, original)
+        with self.lock:
+            pseudonym = self.entries.get(key)
+            if pseudonym is not None:
+                self.entries.move_to_end(key)
+                return pseudonym
+
+            pseudonym = self._load(key)
+            if pseudonym is None:
+                pseudonym = self._store(key, self.generate(label))
+
+            self.entries[key] = pseudonym
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+            return pseudonym
+
+    def _digest(self, key):
+        label, original = key
+        message = f"{label}\0{original}".encode("utf-8", "surrogatepass")
+        return hmac.new(self.secret, message, hashlib.sha256).hexdigest()
+
+    def _load(self, key):
+        if self.store is None:
+            return None
+        rows = self.store.execute("SELECT pseudonym FROM pseudonym_digests WHERE digest = ?", (self._digest(key),))
+        return rows[0][0] if rows else None
+
+    def _store(self, key, pseudonym):
+        if self.store is None:
+            return pseudonym
+        self.store.execute("INSERT OR IGNORE INTO pseudonym_digests VALUES (?, ?)", (self._digest(key), pseudonym))
+        # Another process may have stored this value first; its pseudonym wins
+        return self._load(key)
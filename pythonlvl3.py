@@ -2,6 +2,32 @@ import fitz  # PyMuPDF
 import re
 import os
 
+from detectors import get_detector
+from pdf_pages import PageRedactions, extract_page, iter_page_plans, rects_for_span
+from replacer import replacement_for
+
+SENSITIVE_LABELS = ["EMAIL", "PHONE", "DATE", "ADDRESS", "NAME"]
+
+
+def get_sensitive_spans(text):
+    """
+    Function to find sensitive data, including the middle part of names, addresses, emails, phone numbers,
+    and dates, as (start, end, label) offsets.
+
+    Args:
+        text (str): Text of a PDF page or line.
+    """
+    for start, end, label in get_detector(SENSITIVE_LABELS).scan(text):
+        if label == "NAME":
+            # Only the middle part of "Name: First Middle Last" is redacted
+            separator = re.search(r"[:\-]", text[start:end]).end()
+            parts = list(re.finditer(r"\w+", text[start + separator:end]))
+            if len(parts) == 3:
+                middle = parts[1]
+                yield start + separator + middle.start(), start + separator + middle.end(), "MIDDLE_NAME"
+        else:
+            yield start, end, label
+
 
 def get_sensitive_data(lines):
     """
@@ -11,73 +37,46 @@ def get_sensitive_data(lines):
     Args:
         lines (list): List of text lines from the PDF.
     """
-    EMAIL_REG = r"([\w\.\d]+@[\w\d]+\.[\w\d]+)"
-    PHONE_REG = r"(\+?\d{1,3}[\s-]?)?(\(?\d{3}\)?[\s-]?)?\d{3}[\s-]?\d{4}"
-    DATE_REG = r"(\d{2}[-/]\d{2}[-/]\d{4}|\d{4}[-/]\d{2}[-/]\d{2}|\d{2}[\s/]\d{2}[\s/]\d{4}|" \
-               r"\d{2}\s[A-Za-z]+\s\d{4})"  # Formats: dd-mm-yyyy, yyyy-mm-dd, dd/mm/yyyy, dd Month yyyy
-    ADDRESS_REG = r"(Address\s*[:\-]\s*[A-Za-z0-9\s,]+)"  # Pattern for addresses
-    NAME_REG = r"Name\s*[:\-]\s*(\w+\s\w+\s\w+)"  # Pattern to detect full names like "Name: Rajesh Bhgvan Khavane"
-
     for line in lines:
-        # Check for email
-        if re.search(EMAIL_REG, line, re.IGNORECASE):
-            search = re.search(EMAIL_REG, line, re.IGNORECASE)
-            if search:
-                yield "EMAIL", search.group(1)
-
-        # Check for phone number
-        if re.search(PHONE_REG, line):
-            search = re.search(PHONE_REG, line)
-            if search:
-                yield "PHONE", search.group(0)
-
-        # Check for date
-        if re.search(DATE_REG, line):
-            search = re.search(DATE_REG, line)
-            if search:
-                yield "DATE", search.group(0)
-
-        # Check for address
-        if re.search(ADDRESS_REG, line, re.IGNORECASE):
-            search = re.search(ADDRESS_REG, line, re.IGNORECASE)
-            if search:
-                yield "ADDRESS", search.group(0)
-
-        # Check for names with middle name redaction
-        if re.search(NAME_REG, line, re.IGNORECASE):
-            search = re.search(NAME_REG, line, re.IGNORECASE)
-            if search:
-                full_name = search.group(1)
-                parts = full_name.split()
-                if len(parts) == 3:  # Assuming format "First Middle Last"
-                    middle_name = parts[1]
-                    yield "MIDDLE_NAME", middle_name
-
-
-def redact_pdf(path, mode='blackout'):
+        for start, end, label in get_sensitive_spans(line):
+            yield label, line[start:end]
+
+
+def plan_page(page):
+    """
+    Finds the areas to redact on one page as (rect, label, text) tuples.
+    """
+    text, boxes = extract_page(page)
+    plan = []
+    for start, end, label in get_sensitive_spans(text):
+        for rect in rects_for_span(boxes, start, end):
+            plan.append((tuple(rect), label, text[start:end]))
+    return plan
+
+
+def redact_pdf(path, mode='blackout', workers=1):
     """
     Redact sensitive data in the PDF, including specific middle names, addresses, emails, phone numbers, and dates.
 
     Args:
         path (str): Path to the PDF file.
         mode (str): Redaction mode, either 'blur' or 'blackout'.
+        workers (int): Number of processes the pages are split across.
     """
     if not os.path.exists(path):
         print(f"Error: The file '{path}' does not exist.")
         return
 
     doc = fitz.open(path)
-    for page_number, page in enumerate(doc):
-        text = page.get_text("text")
-        sensitive_data = get_sensitive_data(text.split('\n'))
-        for label, data in sensitive_data:
-            areas = page.search_for(data)
-            for area in areas:
-                if mode == 'blur':
-                    page.add_redact_annot(area, fill=(0, 0, 0), text='*' * len(data))
-                else:
-                    page.add_redact_annot(area, fill=(0, 0, 0))
-        page.apply_redactions()
+    for page, plan in iter_page_plans(doc, plan_page, workers):
+        redactions = PageRedactions(page)
+        for area, label, data in plan:
+            redactions.add(area, label, data)
+
+        if mode == 'blur':
+            redactions.apply(replacement=lambda data, label: replacement_for(data, label, 'blur'))
+        else:
+            redactions.apply()
 
     output_path = 'redacted1.pdf'
     doc.save(output_path)
@@ -0,0 +1,247 @@
+"""
+Headless batch redaction. Walks directories and file lists, dispatches every
+file to the engine for its format and redacts them on a pool of worker
+processes that load the models once.
+
+    python redact.py INPUT [INPUT ...] [--files-from LIST] [--out-dir DIR]
+                     [--level 100] [--style blackout] [--workers N] [--threads T]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from detection_cache import combined_stats, describe, summarize
+from sqlite_store import flush_stores
+
+# Engine for each extension
+ENGINES = {
+    "pdf": "pdf",
+    "pptx": "pptx",
+    "csv": "log",
+    "xlsx": "log",
+    "parquet": "log",
+    "txt": "log",
+    "log": "log",
+}
+COMPRESSIONS = ("gz", "zst")
+# Formats read as a stream, which may also come compressed (.csv.gz, .log.zst)
+STREAMED = ("csv", "txt", "log")
+
+# Variables that cap the threads of the numeric libraries behind spaCy
+THREAD_VARIABLES = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
+_engines = None
+
+
+def engine_for(path):
+    parts = os.path.basename(path).lower().split(".")
+    if len(parts) > 2 and parts[-1] in COMPRESSIONS:
+        parts.pop()
+        if parts[-1] not in STREAMED:
+            return None
+    return ENGINES.get(parts[-1]) if len(parts) > 1 else None
+
+
+def iter_inputs(paths, files_from=None):
+    """Yields every file to redact: files as given, directories walked recursively."""
+    if files_from:
+        with (sys.stdin if files_from == "-" else open(files_from, encoding="utf-8")) as f:
+            paths = list(paths) + [line.strip() for line in f if line.strip()]
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    yield os.path.join(root, name), path
+        else:
+            yield path, os.path.dirname(path) or "."
+
+
+def output_path_for(path, root, out_dir):
+    """Mirrors path under out_dir, or names the output next to the input when out_dir is not set."""
+    if out_dir:
+        return os.path.join(out_dir, os.path.relpath(path, root))
+    directory, name = os.path.split(path)
+    stem, dot, extension = name.partition(".")
+    return os.path.join(directory, f"{stem}_redacted{dot}{extension}")
+
+
+def init_worker(threads, chunksize=None):
+    """Caps the threads of each worker, then loads the models once for all of its files."""
+    global _engines
+    if threads:
+        for variable in THREAD_VARIABLES:
+            os.environ[variable] = str(threads)
+
+    # Outcomes are reported by the parent, so the engines' own prints are dropped
+    sys.stdout = open(os.devnull, "w")
+
+    from pdf_redacter import ACTIONS, PDFRedactor
+    import pptalgo
+    import logalgo
+
+    redactor = PDFRedactor()
+    if chunksize is None:
+        chunksize = logalgo.CSV_CHUNKSIZE
+    _engines = {
+        "pdf": lambda src, dst, level, style: redactor.process_pdf(src, level, ACTIONS[style], output_path=dst),
+        "pptx": lambda src, dst, level, style: pptalgo.redact_ppt(src, dst, level, style),
+        # The pool already spreads files over the cores, so one log is redacted in one process
+        "log": lambda src, dst, level, style: logalgo.redact_file(src, dst, level, style, chunksize, workers=1),
+    }
+
+
+def redact_one(engine, input_path, output_path, level, style):
+    """
+    Redacts one file in a worker. Returns (input path, output path or None,
+    error or None, (detection cache hits, misses) of this file).
+    """
+    before = combined_stats()
+    redacted, error = None, None
+    try:
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        _engines[engine](input_path, output_path, level, style)
+        redacted = output_path if os.path.exists(output_path) else None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        # Pool workers exit without running atexit handlers
+        flush_stores()
+    after = combined_stats()
+    return input_path, redacted, error, (after["hits"] - before["hits"], after["misses"] - before["misses"])
+
+
+def run(jobs, level, style, workers, threads, verbose=False, chunksize=None):
+    """Runs (engine, input, output) jobs on the pool and returns counts of the outcomes."""
+    stats = {"redacted": 0, "clean": 0, "failed": 0, "blacked_out": 0, "bytes": 0, "cache_hits": 0, "cache_misses": 0}
+
+    def new_pool():
+        return ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(threads, chunksize))
+
+    pool = new_pool()
+    try:
+        # Only a few jobs per worker are queued, so huge file lists are never held as futures
+        pending = {}
+        jobs = iter(jobs)
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < workers * 4:
+                job = next(jobs, None)
+                if job is None:
+                    exhausted = True
+                    break
+                engine, input_path, output_path = job
+                try:
+                    stats["bytes"] += os.path.getsize(input_path)
+                except OSError as e:
+                    # A stale list entry or a broken link fails on its own, not the whole run
+                    stats["failed"] += 1
+                    print(f"FAILED {input_path}: {type(e).__name__}: {e}", file=sys.stderr)
+                    continue
+                pending[pool.submit(redact_one, engine, input_path, output_path, level, style)] = (engine, input_path)
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            broken = False
+            for future in done:
+                engine, input_path = pending.pop(future)
+                try:
+                    input_path, output_path, error, (hits, misses) = future.result()
+                except BrokenProcessPool:
+                    broken = True
+                    stats["failed"] += 1
+                    print(f"FAILED {input_path}: a worker process died", file=sys.stderr)
+                    continue
+                stats["cache_hits"] += hits
+                stats["cache_misses"] += misses
+                if error:
+                    stats["failed"] += 1
+                    print(f"FAILED {input_path}: {error}", file=sys.stderr)
+                elif output_path:
+                    stats["redacted"] += 1
+                    if engine == "log" and style == "synthetic":
+                        stats["blacked_out"] += 1
+                    if verbose:
+                        print(f"{input_path} -> {output_path}")
+                else:
+                    stats["clean"] += 1
+                    if verbose:
+                        print(f"{input_path}: no sensitive data found")
+
+            if broken:
+                # A crashed worker (killed, out of memory) fails every file still in flight,
+                # since there is no telling which one took it down; the rest of the run goes on
+                for _, input_path in pending.values():
+                    stats["failed"] += 1
+                    print(f"FAILED {input_path}: a worker process died", file=sys.stderr)
+                pending.clear()
+                pool.shutdown(wait=True)
+                pool = new_pool()
+    finally:
+        pool.shutdown(wait=True)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Redact PDF, PowerPoint and log files in bulk.")
+    parser.add_argument("inputs", nargs="*", help="Files or directories to redact")
+    parser.add_argument("--files-from", help="Read more input paths from this file, one per line ('-' for stdin)")
+    parser.add_argument("--out-dir", help="Write outputs here, mirroring the input tree")
+    parser.add_argument("--level", type=int, default=100, help="Redaction level from 0 to 100")
+    parser.add_argument("--style", choices=["blackout", "blur", "synthetic"], default="blackout",
+                        help="synthetic applies to PDF and PowerPoint; log formats are blacked out instead")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--threads", type=int, default=1, help="Threads per worker process")
+    parser.add_argument("--chunksize", type=int, help="CSV rows read per chunk (default 100000; 0 reads whole files)")
+    parser.add_argument("--skip-existing", action="store_true", help="Skip files whose output already exists")
+    parser.add_argument("--verbose", action="store_true", help="Print every file as it finishes")
+    args = parser.parse_args(argv)
+    if not args.inputs and not args.files_from:
+        parser.error("no inputs given")
+
+    skipped = {"unsupported": 0, "existing": 0}
+
+    out_dir = os.path.abspath(args.out_dir) + os.sep if args.out_dir else None
+
+    def jobs():
+        for path, root in iter_inputs(args.inputs, args.files_from):
+            # Outputs of this or an earlier run are never redacted again
+            if (out_dir and os.path.abspath(path).startswith(out_dir)) or "_redacted." in os.path.basename(path):
+                continue
+            engine = engine_for(path)
+            if engine is None:
+                skipped["unsupported"] += 1
+                continue
+            output_path = output_path_for(path, root, args.out_dir)
+            if args.skip_existing and os.path.exists(output_path):
+                skipped["existing"] += 1
+                continue
+            yield engine, path, output_path
+
+    started = time.perf_counter()
+    stats = run(jobs(), args.level, args.style, args.workers, args.threads, args.verbose, args.chunksize)
+    elapsed = time.perf_counter() - started
+
+    files = stats["redacted"] + stats["clean"] + stats["failed"]
+    megabytes = stats["bytes"] / (1024 * 1024)
+    print(
+        f"{files} files ({megabytes:.1f} MB) in {elapsed:.1f}s: "
+        f"{files / elapsed if elapsed else 0:.1f} files/s, {megabytes / elapsed if elapsed else 0:.1f} MB/s"
+    )
+    print(
+        f"redacted {stats['redacted']}, no findings {stats['clean']}, failed {stats['failed']}, "
+        f"skipped {skipped['unsupported']} unsupported and {skipped['existing']} existing"
+    )
+    if stats["blacked_out"]:
+        # Log formats have no synthetic values, so their engine blacks matches out instead
+        print(f"--style synthetic is not supported for log formats: {stats['blacked_out']} of them were blacked out instead")
+    print(describe(summarize(stats["cache_hits"], stats["cache_misses"], 0)))
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
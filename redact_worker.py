@@ -0,0 +1,225 @@
+import os
+import secrets
+import socket
+import subprocess
+import sys
+import time
+from multiprocessing.connection import Client, Listener
+
+from job_control import Cancelled
+from sqlite_store import flush_stores
+
+AUTHKEY_ENV = "REDACT_WORKER_AUTHKEY"
+
+# Redaction styles as the GUIs name them, mapped to PDFRedactor's action codes
+PDF_ACTIONS = {"blur": "b", "blackout": "x", "synthetic": "s"}
+
+
+class RedactWorker:
+    """
+    Long-lived redaction process. The NER model and Faker are loaded once at
+    start-up, after which every job only pays for detection and writing.
+    """
+
+    def __init__(self):
+        # Imported here so the client side (the GUI) never loads spaCy itself
+        from pdf_redacter import PDFRedactor
+        import pptalgo
+        import docalgo
+        import logalgo
+
+        self.pdf_redactor = PDFRedactor()
+        self.handlers = {
+            "pdf": self.redact_pdf,
+            "ppt": lambda job, progress, cancelled: self.redact_slides(pptalgo, job, progress, cancelled),
+            "doc": lambda job, progress, cancelled: self.redact_slides(docalgo, job, progress, cancelled),
+            "csv": lambda job, progress, cancelled: self.redact_log(logalgo, job, progress, cancelled),
+        }
+
+    def redact_pdf(self, job, progress=None, cancelled=None):
+        action = PDF_ACTIONS.get(job.get("style", "blackout"), "x")
+        return self.pdf_redactor.process_pdf(
+            job["input"], job.get("level", 100), action, progress=progress, cancelled=cancelled
+        )
+
+    def redact_slides(self, module, job, progress=None, cancelled=None):
+        output_path = job.get("output") or os.path.splitext(job["input"])[0] + "_redacted.pptx"
+        module.redact_ppt(
+            job["input"], output_path, job.get("level", 100), style=job.get("style", "blackout"),
+            progress=progress, cancelled=cancelled
+        )
+        return output_path
+
+    def redact_log(self, module, job, progress=None, cancelled=None):
+        output_path = job.get("output") or os.path.splitext(job["input"])[0] + "_redacted.csv"
+        module.redact_file(
+            job["input"], output_path, job.get("level", 100), job.get("style", "blackout"), chunksize=job.get("chunksize", module.CSV_CHUNKSIZE),
+            progress=progress, cancelled=cancelled
+        )
+        return output_path
+
+    def handle(self, job, progress=None, cancelled=None):
+        handler = self.handlers.get(job.get("type"))
+        if handler is None:
+            return {"ok": False, "error": f"Unsupported job type: {job.get('type')}"}
+        try:
+            return {"ok": True, "output": handler(job, progress, cancelled)}
+        except Cancelled:
+            return {"ok": False, "cancelled": True, "error": "Cancelled"}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+        finally:
+            flush_stores()
+
+    @staticmethod
+    def run_job(conn, handle, job):
+        """
+        Runs one job, sending {"progress": [done, total]} messages while it
+        works and stopping once the client sends {"type": "cancel"}.
+        """
+        stop = []
+
+        def progress(done, total):
+            conn.send({"progress": [done, total]})
+
+        def cancelled():
+            while not stop and conn.poll():
+                if conn.recv().get("type") == "cancel":
+                    stop.append(True)
+            return bool(stop)
+
+        return handle(job, progress, cancelled)
+
+    def serve(self, address, authkey):
+        with Listener(address, authkey=authkey) as listener:
+            while True:
+                with listener.accept() as conn:
+                    while True:
+                        try:
+                            job = conn.recv()
+                        except EOFError:
+                            break
+                        if job.get("type") == "shutdown":
+                            conn.send({"ok": True})
+                            return
+                        if job.get("type") == "cancel":
+                            # The job it was meant for has already ended
+                            continue
+                        conn.send(self.run_job(conn, self.handle, job))
+
+
+class RedactWorkerClient:
+    """
+    Starts a RedactWorker in the background on first use and submits jobs to it
+    over a local socket. The worker is stopped again by close().
+    """
+
+    def __init__(self, startup_timeout=120):
+        self.startup_timeout = startup_timeout
+        self.process = None
+        self.conn = None
+
+    def start(self):
+        if self.conn is not None:
+            return
+
+        authkey = secrets.token_hex(16)
+        address = ("127.0.0.1", self._free_port())
+        env = dict(os.environ, **{AUTHKEY_ENV: authkey})
+        worker_script = os.path.abspath(__file__)
+        self.process = subprocess.Popen(
+            [sys.executable, worker_script, str(address[1])],
+            cwd=os.path.dirname(worker_script),
+            env=env,
+        )
+
+        # Model loading happens before the worker starts listening
+        deadline = time.monotonic() + self.startup_timeout
+        while True:
+            try:
+                self.conn = Client(address, authkey=authkey.encode())
+                return
+            except ConnectionRefusedError:
+                if self.process.poll() is not None:
+                    raise RuntimeError("Redaction worker exited during start-up.")
+                if time.monotonic() > deadline:
+                    self.process.kill()
+                    raise RuntimeError("Timed out waiting for the redaction worker.")
+                time.sleep(0.2)
+
+    def submit(self, job, progress=None, cancelled=None):
+        """
+        Runs a job on the worker and returns the path of the redacted file.
+        progress(done, total) is called as the worker reports it, and once
+        cancelled() returns true the worker is asked to stop and Cancelled is
+        raised.
+        """
+        self.start()
+        try:
+            result = self._run(job, progress, cancelled)
+        except (EOFError, OSError):
+            # The worker died (a crash on a bad file, or killed for memory); the
+            # next job starts a fresh one
+            self._discard()
+            raise RuntimeError("The redaction worker stopped unexpectedly; the job was not completed.")
+        if result.get("cancelled"):
+            raise Cancelled()
+        if not result["ok"]:
+            raise RuntimeError(result["error"])
+        return result["output"]
+
+    def _run(self, job, progress, cancelled):
+        """Sends a job and returns the worker's final reply, forwarding progress and cancellation."""
+        self.conn.send(job)
+        cancel_sent = False
+        while True:
+            if not cancel_sent and cancelled is not None and cancelled():
+                self.conn.send({"type": "cancel"})
+                cancel_sent = True
+            if not self.conn.poll(0.1):
+                if self.process is not None and self.process.poll() is not None:
+                    raise EOFError()
+                continue
+            result = self.conn.recv()
+            if "progress" in result:
+                if progress is not None:
+                    progress(*result["progress"])
+                continue
+            return result
+
+    def _discard(self):
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+        self.conn = None
+        if self.process is not None:
+            if self.process.poll() is None:
+                self.process.kill()
+            self.process.wait()
+            self.process = None
+
+    def close(self):
+        if self.conn is not None:
+            try:
+                self.conn.send({"type": "shutdown"})
+                self.conn.recv()
+            except (EOFError, OSError):
+                pass
+            self.conn.close()
+            self.conn = None
+        if self.process is not None:
+            self.process.wait(timeout=10)
+            self.process = None
+
+    @staticmethod
+    def _free_port():
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            return sock.getsockname()[1]
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1])
+    authkey = os.environ[AUTHKEY_ENV].encode()
+    RedactWorker().serve(("127.0.0.1", port), authkey)
@@ -0,0 +1,70 @@
+BLACKOUT_SYMBOL = "█"
+BLUR_SYMBOL = "*"
+
+
+def replacement_for(original, label, style, synthesize=None, blur_symbol=BLUR_SYMBOL):
+    """
+    Returns the text that replaces one detected value in the given style.
+    synthesize(label, original) supplies the value for synthetic replacement.
+    """
+    if style == "blackout":
+        return BLACKOUT_SYMBOL * len(original)
+    elif style == "blur":
+        return blur_symbol * len(original)
+    elif style == "synthetic":
+        return synthesize(label, original)
+    elif style == "tag":
+        return f"[{label}]"
+    else:
+        return "[REDACTED]"
+
+
+def resolve_overlaps(spans):
+    """
+    Sorts (start, end, label) spans and merges overlapping ones, so that no part
+    of a detected value survives. A merged span keeps the label of the span that
+    starts first (the longest one when several start together).
+    """
+    resolved = []
+    for start, end, label in sorted(spans, key=lambda span: (span[0], span[0] - span[1])):
+        if end <= start:
+            continue
+        if resolved and start < resolved[-1][1]:
+            previous = resolved[-1]
+            resolved[-1] = (previous[0], max(previous[1], end), previous[2])
+        else:
+            resolved.append((start, end, label))
+    return resolved
+
+
+def splice(text, spans, style="blackout", synthesize=None, blur_symbol=BLUR_SYMBOL):
+    """
+    Replaces every (start, end, label) span of text in one left-to-right pass.
+    Replacement values are never rescanned, so they cannot be redacted again.
+    """
+    pieces = []
+    last = 0
+    for start, end, label in resolve_overlaps(spans):
+        pieces.append(text[last:start])
+        pieces.append(replacement_for(text[start:end], label, style, synthesize, blur_symbol))
+        last = end
+    pieces.append(text[last:])
+    return "".join(pieces)
+
+
+def splice_styled(text, spans, synthesize=None, blur_symbol=BLUR_SYMBOL):
+    """
+    Like splice(), for (start, end, label, style) spans that each carry their
+    own style, as read back from a manifest. A span overlapping an earlier one
+    is skipped.
+    """
+    pieces = []
+    last = 0
+    for start, end, label, style in sorted(spans):
+        if start < last or end <= start:
+            continue
+        pieces.append(text[last:start])
+        pieces.append(replacement_for(text[start:end], label, style, synthesize, blur_symbol))
+        last = end
+    pieces.append(text[last:])
+    return "".join(pieces)
@@ -0,0 +1,54 @@
+from collections import deque
+
+
+class EntityIndex:
+    """
+    Aho-Corasick automaton over a set of entity strings. finditer() reports
+    every occurrence of every entity in a single pass over the text, however
+    many entities the index holds.
+    """
+
+    def __init__(self, entities):
+        # entities: iterable of (text, label); the first label seen for a text wins
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+
+        seen = set()
+        for word, label in entities:
+            if not word or word in seen:
+                continue
+            seen.add(word)
+            node = 0
+            for ch in word:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                node = nxt
+            self.output[node].append((len(word), label))
+
+        # Breadth-first pass to fill in failure links
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                fallback = self.fail[node]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(ch, 0)
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+
+    def finditer(self, text):
+        """Yields (start, end, label) for each entity occurrence, ordered by end offset."""
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            for length, label in self.output[node]:
+                yield i + 1 - length, i + 1, label
@@ -0,0 +1,55 @@
+import os
+import sqlite3
+import threading
+
+# How long a writer waits for another process to release the database, in seconds
+BUSY_TIMEOUT = 30
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+class Store:
+    """A SQLite connection and the lock that serializes its use across threads."""
+
+    def __init__(self, path):
+        # Autocommit: every insert is committed at once, so other connections
+        # see it immediately and nothing is lost if the process exits abruptly
+        self.db = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.lock = threading.Lock()
+
+    def execute(self, sql, parameters=()):
+        with self.lock:
+            return self.db.execute(sql, parameters).fetchall()
+
+    def checkpoint(self):
+        with self.lock:
+            self.db.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+
+def open_store(path):
+    """
+    Returns this process's connection to the SQLite file at path, opened on
+    first use and shared by every cache kept in that file. A forked child
+    opens its own instead of reusing the parent's.
+    """
+    key = (os.getpid(), os.path.abspath(path))
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = Store(path)
+        return store
+
+
+def flush_stores():
+    """
+    Moves what this process has written into the database files themselves.
+    Called when a job ends; committed rows are visible to other processes
+    before that, through the write-ahead log.
+    """
+    pid = os.getpid()
+    with _stores_lock:
+        stores = [store for (store_pid, _), store in _stores.items() if store_pid == pid]
+    for store in stores:
+        store.checkpoint()
@@ -0,0 +1,77 @@
+import threading
+from collections import deque
+
+from faker import Faker
+
+# How each label is faked
+GENERATORS = {
+    "PERSON": lambda fake: fake.name(),
+    "ORG": lambda fake: fake.company(),
+    "EMAIL": lambda fake: fake.email(),
+    "PHONE": lambda fake: fake.phone_number(),
+    "MONEY": lambda fake: fake.pricetag(),
+    "IP": lambda fake: fake.ipv4(),
+    "IPV6": lambda fake: fake.ipv6(),
+    "DATE": lambda fake: fake.date(),
+    "TIME": lambda fake: fake.time(),
+    "ADDRESS": lambda fake: fake.address(),
+    "GPE": lambda fake: fake.city(),
+}
+
+
+class SyntheticPool:
+    """
+    Keeps a pool of pre-generated fake values for every label, topped up by a
+    background thread, so drawing a value is a deque pop instead of a Faker
+    call. A value is only generated on the spot when its pool has run dry.
+    """
+
+    def __init__(self, size=256, generators=GENERATORS):
+        self.size = size
+        self.generators = generators
+        self.pools = {label: deque() for label in generators}
+        # Faker instances are not shared between threads
+        self.fake = Faker()
+        self.refill_fake = Faker()
+        self.wanted = threading.Event()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def draw(self, label, default=None):
+        """Returns a fake value for label, or default for labels that cannot be faked."""
+        pool = self.pools.get(label)
+        if pool is None:
+            return default
+        self._start()
+        try:
+            value = pool.popleft()
+        except IndexError:
+            with self.lock:
+                value = self.generators[label](self.fake)
+        if len(pool) < self.size // 2:
+            self.wanted.set()
+        return value
+
+    def _start(self):
+        # Started on first use, and again in a forked worker where it did not survive
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._refill, daemon=True)
+            self.thread.start()
+            self.wanted.set()
+
+    def _refill(self):
+        while True:
+            self.wanted.wait()
+            self.wanted.clear()
+            for label, pool in self.pools.items():
+                generate = self.generators[label]
+                while len(pool) < self.size:
+                    pool.append(generate(self.refill_fake))
+
+
+_pool = SyntheticPool()
+
+
+def draw(label, default=None):
+    """Draws a fake value for label from the process-wide pool."""
+    return _pool.draw(label, default)
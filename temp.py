@@ -1,7 +1,9 @@
 import fitz  # PyMuPDF
-import spacy
+from nlp_loader import load_nlp
 import os
-import re
+
+from detectors import get_detector
+from pdf_pages import extract_spans
 
 # Function to extract text from PDF and get block coordinates
 def extract_text_and_coordinates(pdf_path):
@@ -11,20 +13,18 @@ def extract_text_and_coordinates(pdf_path):
 
     for page_num in range(len(doc)):
         page = doc.load_page(page_num)
-        text += page.get_text("text")
-        for block in page.get_text("dict")["blocks"]:
-            if block['type'] == 0:  # Only text blocks
-                for line in block["lines"]:
-                    for span in line["spans"]:
-                        blocks.append({
-                            "text": span["text"],
-                            "bbox": span["bbox"],  # Coordinates (x0, y0, x1, y1)
-                            "page_num": page_num,  # Store page number for each block
-                        })
+        page_text, spans = extract_spans(page)  # One text-only parse per page
+        text += page_text
+        for span in spans:
+            blocks.append({
+                "text": span["text"],
+                "bbox": span["bbox"],  # Coordinates (x0, y0, x1, y1)
+                "page_num": page_num,  # Store page number for each block
+            })
     return text, blocks
 
 # Load the pre-trained spaCy model
-nlp = spacy.load("en_core_web_sm")
+nlp = load_nlp()
 
 # Function to extract sensitive data (including email and phone numbers)
 def extract_sensitive_data(text):
@@ -34,19 +34,11 @@ def extract_sensitive_data(text):
     # Extract named entities (PERSON, GPE, ORG, DATE, MONEY)
     for ent in doc.ents:
         if ent.label_ in ['PERSON', 'GPE', 'ORG', 'DATE', 'MONEY']:
-            sensitive_data.append((ent.start, ent.end, ent.text, ent.label_))  # Store span of the sensitive data and label
+            sensitive_data.append((ent.start_char, ent.end_char, ent.text, ent.label_))  # Store span of the sensitive data and label
 
     # Use regex to find email addresses and phone numbers
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b'
-    phone_pattern = r'\b(\+?[0-9]{1,3})?[-. ]?(\(?\d{3}\)?[-. ]?\d{3}[-. ]?\d{4})\b'
-
-    emails = re.findall(email_pattern, text)
-    phones = re.findall(phone_pattern, text)
-
-    for email in emails:
-        sensitive_data.append((0, 0, email, 'EMAIL'))  # Add email
-    for phone in phones:
-        sensitive_data.append((0, 0, phone[1], 'PHONE'))  # Add phone number
+    for start, end, label in get_detector(['EMAIL', 'PHONE']).scan(text):
+        sensitive_data.append((start, end, text[start:end], label))
 
     return sensitive_data
 
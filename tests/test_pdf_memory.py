@@ -0,0 +1,38 @@
+"""
+Peak RSS of PDFRedactor.process_pdf must not grow with the length of the
+document. Slow: builds and redacts a 5,000-page PDF, so it only runs with
+REDACT_SLOW_TESTS=1.
+"""
+import os
+import sys
+
+import pytest
+
+pytestmark = pytest.mark.skipif(not os.environ.get("REDACT_SLOW_TESTS"), reason="set REDACT_SLOW_TESTS=1 to run")
+
+pytest.importorskip("fitz")
+pytest.importorskip("spacy")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from bench_pdf_memory import make_pdf, measure  # noqa: E402
+
+# Allowance for allocator noise on top of the growth of the short run, in MB
+SLACK_MB = 32
+
+
+def test_rss_is_bounded_on_long_documents(tmp_path):
+    short_path = str(tmp_path / "short.pdf")
+    long_path = str(tmp_path / "long.pdf")
+    make_pdf(short_path, 500)
+    make_pdf(long_path, 5000)
+
+    # Growth above the loaded model, so the model's own size cannot hide it
+    short_baseline, short_peak = measure(short_path, workers=1)
+    long_baseline, long_peak = measure(long_path, workers=1)
+    short_growth = short_peak - short_baseline
+    long_growth = long_peak - long_baseline
+
+    assert long_growth < 2 * short_growth + SLACK_MB, (
+        f"RSS grew {short_growth:.0f} MB over 500 pages and {long_growth:.0f} MB over 5000"
+    )
@@ -0,0 +1,26 @@
+import os
+
+STYLES = ("blackout", "blur", "synthetic")
+
+
+def parse_variants(spec, styles=STYLES):
+    """Parses a batch spec such as "blackout-50, synthetic-100" into [("blackout", 50), ("synthetic", 100)]."""
+    variants = []
+    for item in spec.replace(";", ",").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        style, _, level = item.rpartition("-")
+        if not style or not level.isdigit():
+            raise ValueError(f"Invalid variant '{item}', expected style-level such as blackout-50")
+        style = style.strip().lower()
+        if style not in styles:
+            raise ValueError(f"Unknown style '{style}' in variant '{item}', expected one of: {', '.join(styles)}")
+        variants.append((style, int(level)))
+    return variants
+
+
+def variant_path(path, style, level):
+    """Returns the output path of one variant, e.g. report_redacted_blackout-50.pdf for report.pdf."""
+    root, ext = os.path.splitext(path)
+    return f"{root}_redacted_{style}-{level}{ext}"